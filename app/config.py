@@ -14,7 +14,34 @@ class Settings(BaseSettings):
     # Tunable — sensible defaults, overridable at runtime
     fetch_keyword: str = "markets"
     fetch_interval_hours: int = 6
+    scheduler_enabled: bool = False
+    scheduler_poll_seconds: int = 15
+    leader_lease_ttl: int = 30
+    fetch_lock_ttl: int = 60
+    fetch_run_ttl: int = 604800
     summary_cache_ttl: int = 86400
+    summary_queue_size: int = 32
+    summary_workers: int = 4
+    summary_job_ttl: int = 3600
+    summary_retry_after: int = 5
+    summary_timeout: float = 60.0
+    articles_partitioned: bool = False
+    partition_months_ahead: int = 3
+    retention_months: int = 24
+    archive_dir: str | None = None
+    dedup_min_similarity: float = 0.7
+    related_index_dir: str = "data/related_index"
+    thumbnail_dir: str = "data/thumbnails"
+    thumbnail_cache_bytes: int = 512 * 1024 * 1024
+    thumbnail_workers: int = 2
+    thumbnail_max_source_bytes: int = 10 * 1024 * 1024
+    traffic_capture_path: str | None = None
+    traffic_capture_sample_rate: float = 1.0
+    server_timing: bool = False
+    admin_token: str | None = None
+    profile_sample_rate: float = 0.0
+    profile_dir: str = "data/profiles"
+    profile_interval_ms: float = 5.0
 
 
 settings = Settings()
@@ -14,3 +14,8 @@ class Base(DeclarativeBase):
 async def get_db():
     async with async_session() as session:
         yield session
+
+
+def get_session_factory() -> async_sessionmaker:
+    # For work that outlives the request, e.g. background fetch runs
+    return async_session
@@ -4,15 +4,32 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
-from app.database import engine
-from app.redis import close_redis, init_redis
+from app.config import settings
+from app.database import async_session, engine
+from app.middleware.capture import TrafficCaptureMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.timing import ServerTimingMiddleware
+from app.redis import close_redis, get_redis, init_redis
 from app.routers.articles import router as articles_router
+from app.services.jobs import summary_queue
+from app.services.scheduler import FetchScheduler, stop_background_runs
+from app.services.thumbnails import thumbnailer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_redis()
+    await summary_queue.start()
+    scheduler = FetchScheduler(async_session) if settings.scheduler_enabled else None
+    if scheduler:
+        await scheduler.start(await get_redis())
     yield
+    if scheduler:
+        await scheduler.stop()
+    # Runs write their final state and release the run lock, so Redis must still be open
+    await stop_background_runs()
+    await summary_queue.stop()
+    thumbnailer.shutdown()
     await close_redis()
     await engine.dispose()
 
@@ -20,6 +37,30 @@ async def lifespan(app: FastAPI):
 app = FastAPI(title="Data Summarization Service", lifespan=lifespan)
 app.include_router(articles_router)
 
+# Middleware added last runs first: capture sees the full request, timing wraps the app
+if settings.server_timing or settings.admin_token:
+    app.add_middleware(
+        ServerTimingMiddleware,
+        public=settings.server_timing,
+        admin_token=settings.admin_token,
+    )
+
+if settings.admin_token or settings.profile_sample_rate:
+    app.add_middleware(
+        ProfilingMiddleware,
+        output_dir=settings.profile_dir,
+        admin_token=settings.admin_token,
+        sample_rate=settings.profile_sample_rate,
+        interval_ms=settings.profile_interval_ms,
+    )
+
+if settings.traffic_capture_path:
+    app.add_middleware(
+        TrafficCaptureMiddleware,
+        path=settings.traffic_capture_path,
+        sample_rate=settings.traffic_capture_sample_rate,
+    )
+
 
 @app.get("/health")
 async def health():
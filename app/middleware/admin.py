@@ -0,0 +1,12 @@
+import hmac
+
+from starlette.datastructures import Headers
+from starlette.types import Scope
+
+
+def has_admin_token(scope: Scope, admin_token: str | None) -> bool:
+    """True when the request presents `X-Admin-Token` matching ADMIN_TOKEN (never when unset)."""
+    if not admin_token:
+        return False
+    token = Headers(scope=scope).get("x-admin-token", "")
+    return hmac.compare_digest(token, admin_token)
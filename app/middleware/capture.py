@@ -0,0 +1,56 @@
+"""Opt-in traffic capture: append sampled requests to a JSONL file for replay.
+
+Enabled by setting TRAFFIC_CAPTURE_PATH. Each line records method, path, query,
+matched route, status, duration and the X-Cache hit flag. Lines are written with
+a single O_APPEND write, so several uvicorn workers can share one file.
+"""
+
+import json
+import os
+import random
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class TrafficCaptureMiddleware:
+    def __init__(self, app: ASGIApp, path: str, sample_rate: float = 1.0):
+        self.app = app
+        self.sample_rate = sample_rate
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.time()
+        t0 = time.perf_counter()
+        status = 500
+        cache_hit = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, cache_hit
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"x-cache":
+                        cache_hit = value.upper() == b"HIT"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            record = {
+                "ts": started,
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope["query_string"].decode("latin-1"),
+                "route": getattr(route, "path", None),
+                "status": status,
+                "duration_ms": round((time.perf_counter() - t0) * 1000, 3),
+                "cache_hit": cache_hit,
+            }
+            os.write(self._fd, (json.dumps(record) + "\n").encode())
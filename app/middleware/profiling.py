@@ -0,0 +1,107 @@
+"""On-demand statistical profiling of single requests.
+
+A request is profiled when it carries `X-Profile: 1` and a matching
+`X-Admin-Token`, or when it is picked by PROFILE_SAMPLE_RATE. A background
+thread samples the event-loop thread's stack every PROFILE_INTERVAL_MS and
+writes the samples in collapsed-stack format (`frame;frame;frame count`) to
+PROFILE_DIR. flamegraph.pl, inferno or speedscope can render that file.
+
+The sampler sees the whole event-loop thread, so coroutines of concurrent
+requests appear in the profile too. Profile on a quiet instance for clean output.
+"""
+
+import asyncio
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.admin import has_admin_token
+
+_SLUG_RE = re.compile(r"[^A-Za-z0-9]+")
+
+
+def fold(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler(threading.Thread):
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[fold(frame)] += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+def write_folded(stacks: Counter, path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        output_dir: str,
+        admin_token: str | None = None,
+        sample_rate: float = 0.0,
+        interval_ms: float = 5.0,
+    ):
+        self.app = app
+        self.output_dir = output_dir
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+
+    def _requested(self, scope: Scope) -> bool:
+        return Headers(scope=scope).get("x-profile") == "1" and has_admin_token(scope, self.admin_token)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = self._requested(scope)
+        if not requested and not (self.sample_rate and random.random() < self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        slug = _SLUG_RE.sub("-", scope["path"]).strip("-") or "root"
+        path = os.path.join(self.output_dir, f"{time.time_ns()}-{scope['method']}-{slug}.folded")
+
+        async def send_wrapper(message: Message) -> None:
+            if requested and message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Path", path)
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            await asyncio.to_thread(sampler.stop)
+            await asyncio.to_thread(write_folded, sampler.stacks, path)
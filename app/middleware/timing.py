@@ -0,0 +1,74 @@
+import functools
+import inspect
+import time
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.admin import has_admin_token
+from app.timing import RequestTimings, current_timings
+
+SPAN_ORDER = ("db", "redis", "llm", "serialize")
+
+
+def format_server_timing(timings: RequestTimings, total: float) -> str:
+    entries = [f"{name};dur={timings.spans[name] * 1000:.1f}" for name in SPAN_ORDER if name in timings.spans]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """Adds `Server-Timing: db;dur=…, redis;dur=…, llm;dur=…, serialize;dur=…, total;dur=…`.
+
+    The breakdown goes to every caller when `public` is set, otherwise only to
+    requests carrying the admin token. Other requests are not timed at all.
+    """
+
+    def __init__(self, app: ASGIApp, public: bool = False, admin_token: str | None = None):
+        self.app = app
+        self.public = public
+        self.admin_token = admin_token
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not (self.public or has_admin_token(scope, self.admin_token)):
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                if timings.endpoint_done is not None:
+                    timings.add("serialize", now - timings.endpoint_done)
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", format_server_timing(timings, now - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_timings.reset(token)
+
+
+class TimedRoute(APIRoute):
+    """Marks when the endpoint returns, so the rest of the handler counts as `serialize`."""
+
+    def __init__(self, path, endpoint, **kwargs):
+        if not inspect.iscoroutinefunction(endpoint):
+            super().__init__(path, endpoint, **kwargs)
+            return
+
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args, **kw):
+            try:
+                return await endpoint(*args, **kw)
+            finally:
+                timings = current_timings.get()
+                if timings is not None:
+                    timings.endpoint_done = time.perf_counter()
+
+        super().__init__(path, timed_endpoint, **kwargs)
@@ -1,16 +1,49 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, String, Text, func
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Index,
+    Integer,
+    LargeBinary,
+    SmallInteger,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.dialects.postgresql import UUID
 
+from app.config import settings
 from app.database import Base
 
 
+# Partitioned by published_at month (see app/services/partitions.py). PostgreSQL
+# requires the partition key in every unique constraint, so published_at joins
+# the primary key and external_uuid uniqueness becomes per published_at.
+_partitioned = settings.articles_partitioned
+
+
 class Article(Base):
     __tablename__ = "articles"
+    __table_args__ = (
+        # Export orders by (fetched_at, id) and filters incremental pulls on fetched_at
+        Index("ix_articles_fetched_at_id", "fetched_at", "id"),
+        *(
+            (
+                UniqueConstraint("external_uuid", "published_at"),
+                Index("ix_articles_external_uuid", "external_uuid"),
+                Index("ix_articles_published_at", "published_at"),
+                {"postgresql_partition_by": "RANGE (published_at)"},
+            )
+            if _partitioned
+            else ()
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    external_uuid = Column(String, unique=True, nullable=False)
+    external_uuid = Column(String, unique=not _partitioned, nullable=False)
     title = Column(Text, nullable=False)
     description = Column(Text)
     snippet = Column(Text)
@@ -19,6 +52,34 @@ class Article(Base):
     image_url = Column(String, nullable=True)
     source = Column(String)
     language = Column(String, default="en")
-    published_at = Column(DateTime(timezone=True))
+    published_at = Column(DateTime(timezone=True), primary_key=_partitioned)
     search_keyword = Column(String)
     fetched_at = Column(DateTime(timezone=True), server_default=func.now())
+    minhash = Column(LargeBinary, nullable=True)
+    # id of the cluster representative; equals id for the representative itself
+    cluster_id = Column(UUID(as_uuid=True), nullable=True)
+
+
+class ArticleStat(Base):
+    """Rollup of article counts, maintained incrementally by the fetcher.
+
+    Missing sources/keywords are stored as "" so they can be part of the key.
+    """
+
+    __tablename__ = "article_stats"
+
+    day = Column(Date, primary_key=True)
+    source = Column(String, primary_key=True, default="")
+    search_keyword = Column(String, primary_key=True, default="")
+    article_count = Column(Integer, nullable=False, default=0)
+    with_content = Column(Integer, nullable=False, default=0)
+
+
+class MinhashBand(Base):
+    """LSH index: one row per band of an article's MinHash signature (see app/services/dedup.py)."""
+
+    __tablename__ = "minhash_bands"
+
+    band = Column(SmallInteger, primary_key=True)
+    value = Column(Integer, primary_key=True)
+    article_id = Column(UUID(as_uuid=True), primary_key=True)
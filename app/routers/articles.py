@@ -1,20 +1,51 @@
+import asyncio
+from datetime import date, datetime
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import redis.asyncio as redis
 
-from app.database import get_db
+from app.config import settings
+from app.database import get_db, get_session_factory
+from app.middleware.timing import TimedRoute
 from app.models import Article
 from app.redis import get_redis
-from app.schemas import ArticleDetail, ArticleListItem, ArticleSummary, FetchResult, PaginatedResponse
-from app.services.cache import cache_summary, get_cached_summary
-from app.services.fetcher import fetch_and_store_articles
-from app.services.summarizer import summarize_article
+from app.schemas import (
+    ArticleDetail,
+    ArticleListItem,
+    ArticleStats,
+    ArticleSummary,
+    FetchResult,
+    FetchRunStatus,
+    PaginatedResponse,
+    RelatedArticle,
+    SummaryJobStatus,
+)
+from app.services.cache import get_cached_summary
+from app.services.export import export_articles, gzip_stream
+from app.services.jobs import QueueFullError, SummaryQueue, get_job_state, get_summary_queue
+from app.services.related import RelatedIndex, get_related_index
+from app.services.scheduler import get_run_state, start_run
+from app.services.stats import get_stats
+from app.services.thumbnails import (
+    FORMATS,
+    WIDTHS,
+    ThumbnailError,
+    Thumbnailer,
+    get_thumbnailer,
+    pick_width,
+    thumbnail_etag,
+)
+from app.timing import span
 
-router = APIRouter(prefix="/articles", tags=["articles"])
+router = APIRouter(prefix="/articles", tags=["articles"], route_class=TimedRoute)
 
 
 @router.get("", response_model=PaginatedResponse)
@@ -23,21 +54,51 @@ async def list_articles(
     page_size: int = Query(20, ge=1, le=100),
     search_keyword: str | None = None,
     source: str | None = None,
+    published_after: datetime | None = None,
+    published_before: datetime | None = None,
+    collapse_duplicates: bool = False,
     db: AsyncSession = Depends(get_db),
 ):
-    query = select(Article)
-    count_query = select(func.count()).select_from(Article)
-
+    conditions = []
+    # A time window lets Postgres prune partitions when articles is partitioned
+    if published_after:
+        conditions.append(Article.published_at >= published_after)
+    if published_before:
+        conditions.append(Article.published_at < published_before)
     if search_keyword:
-        query = query.where(Article.search_keyword == search_keyword)
-        count_query = count_query.where(Article.search_keyword == search_keyword)
+        conditions.append(Article.search_keyword == search_keyword)
     if source:
-        query = query.where(Article.source == source)
-        count_query = count_query.where(Article.source == source)
+        conditions.append(Article.source == source)
+
+    if collapse_duplicates:
+        # One row per cluster among the rows that pass the filters, so a cluster
+        # whose representative is filtered out (or expired) still shows up.
+        # The representative wins when present, otherwise the newest member.
+        cluster = func.coalesce(Article.cluster_id, Article.id)
+        ranked = (
+            select(
+                Article,
+                func.row_number()
+                .over(
+                    partition_by=cluster,
+                    order_by=(case((cluster == Article.id, 0), else_=1), Article.published_at.desc()),
+                )
+                .label("cluster_rank"),
+            )
+            .where(*conditions)
+            .subquery()
+        )
+        article = aliased(Article, ranked)
+        query = select(article).where(ranked.c.cluster_rank == 1)
+        count_query = select(func.count()).select_from(ranked).where(ranked.c.cluster_rank == 1)
+    else:
+        article = Article
+        query = select(Article).where(*conditions)
+        count_query = select(func.count()).select_from(Article).where(*conditions)
 
     total = (await db.execute(count_query)).scalar()
 
-    query = query.order_by(Article.published_at.desc())
+    query = query.order_by(article.published_at.desc())
     query = query.offset((page - 1) * page_size).limit(page_size)
     rows = (await db.execute(query)).scalars().all()
 
@@ -49,12 +110,94 @@ async def list_articles(
     )
 
 
-@router.post("/fetch", response_model=FetchResult)
+@router.get("/stats", response_model=ArticleStats)
+async def article_stats(
+    since: date | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    return await get_stats(db, since)
+
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    since: datetime | None = Query(None, description="Only rows fetched after this time"),
+    compress: bool = Query(False, description="gzip the stream (Content-Encoding: gzip)"),
+    db: AsyncSession = Depends(get_db),
+):
+    body = export_articles(db, format, since)
+    headers = {"Content-Disposition": f'attachment; filename="articles.{format}"'}
+    if compress:
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
+
+
+def _fetch_status_url(run_id: str) -> str:
+    return f"{router.prefix}/fetch/{run_id}"
+
+
+def _run_status(run_id: str, state: dict) -> FetchRunStatus:
+    return FetchRunStatus(
+        run_id=run_id,
+        status=state["status"],
+        keyword=state.get("keyword"),
+        trigger=state.get("trigger"),
+        status_url=_fetch_status_url(run_id),
+        processed=state.get("processed"),
+        total=state.get("total"),
+        started_at=state.get("started_at"),
+        finished_at=state.get("finished_at"),
+        result=FetchResult.model_validate_json(state["result"]) if state.get("result") else None,
+        error=state.get("error"),
+    )
+
+
+@router.post("/fetch", response_model=FetchRunStatus, status_code=202)
 async def trigger_fetch(
     keyword: str = Query("markets"),
-    db: AsyncSession = Depends(get_db),
+    r: redis.Redis = Depends(get_redis),
+    session_factory=Depends(get_session_factory),
 ):
-    return await fetch_and_store_articles(keyword, db)
+    # Returns the in-progress run instead of starting an overlapping one
+    run_id, _ = await start_run(keyword, r, session_factory, "api")
+    state = await get_run_state(run_id, r) or {"status": "running"}
+    return _run_status(run_id, state)
+
+
+@router.get("/fetch/{run_id}", response_model=FetchRunStatus)
+async def get_fetch_run(run_id: str, r: redis.Redis = Depends(get_redis)):
+    state = await get_run_state(run_id, r)
+    if not state:
+        raise HTTPException(status_code=404, detail="Fetch run not found")
+    return _run_status(run_id, state)
+
+
+def _job_poll_url(job_id: str) -> str:
+    return f"{router.prefix}/summary-jobs/{job_id}"
+
+
+@router.get("/summary-jobs/{job_id}", response_model=SummaryJobStatus)
+async def get_summary_job(job_id: str, r: redis.Redis = Depends(get_redis)):
+    state = await get_job_state(job_id, r)
+    if not state:
+        raise HTTPException(status_code=404, detail="Summary job not found")
+
+    summary = None
+    if state["status"] == "done":
+        summary = await get_cached_summary(UUID(state["article_id"]), r)
+
+    return SummaryJobStatus(
+        job_id=job_id,
+        article_id=state["article_id"],
+        status=state["status"],
+        poll_url=_job_poll_url(job_id),
+        summary=summary,
+        error=state.get("error"),
+    )
 
 
 @router.get("/{article_id}", response_model=ArticleDetail)
@@ -69,11 +212,109 @@ async def get_article(article_id: UUID, db: AsyncSession = Depends(get_db)):
     return ArticleDetail.model_validate(article)
 
 
-@router.get("/{article_id}/summary", response_model=ArticleSummary)
+@router.get("/{article_id}/related", response_model=list[RelatedArticle])
+async def get_related(
+    article_id: UUID,
+    k: int = Query(5, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    index: RelatedIndex = Depends(get_related_index),
+):
+    article = (
+        await db.execute(select(Article).where(Article.id == article_id))
+    ).scalar_one_or_none()
+
+    if not article:
+        raise HTTPException(status_code=404, detail="Article not found")
+
+    # Over-fetch so near-duplicates of this story can be dropped
+    scored = dict(await run_in_threadpool(index.related, article_id, k + 10))
+    if not scored:
+        return []
+
+    rows = (await db.execute(select(Article).where(Article.id.in_(scored)))).scalars().all()
+    results = [
+        RelatedArticle(**ArticleListItem.model_validate(r).model_dump(), score=scored[r.id])
+        for r in rows
+        if not (article.cluster_id and r.cluster_id == article.cluster_id)
+    ]
+    results.sort(key=lambda r: r.score, reverse=True)
+    return results[:k]
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (t.strip().removeprefix("W/") for t in header.split(","))
+
+
+@router.get(
+    "/{article_id}/thumbnail",
+    response_class=Response,
+    responses={
+        200: {"content": {media_type: {} for media_type in FORMATS.values()}},
+        304: {"description": "Not modified (If-None-Match)"},
+        502: {"description": "Source image could not be fetched or decoded"},
+    },
+)
+async def get_thumbnail(
+    article_id: UUID,
+    request: Request,
+    w: int = Query(WIDTHS[0], ge=1, description=f"Rounded up to one of {list(WIDTHS)}"),
+    format: Literal["webp", "jpeg"] | None = Query(None, description="Default: webp if accepted"),
+    db: AsyncSession = Depends(get_db),
+    thumbnailer: Thumbnailer = Depends(get_thumbnailer),
+):
+    width = pick_width(w)
+    fmt = format or ("webp" if "image/webp" in request.headers.get("accept", "") else "jpeg")
+    etag = thumbnail_etag(article_id, width, fmt)
+    # Variants never change for an article, so browsers and CDNs can keep them forever
+    headers = {"Cache-Control": "public, max-age=31536000, immutable", "ETag": etag}
+    if format is None:
+        headers["Vary"] = "Accept"
+
+    revalidating = _etag_matches(request, etag)
+    # A cached variant proves the article exists, so revalidation costs one stat
+    if revalidating and await asyncio.to_thread(thumbnailer.cache.has, article_id, width, fmt):
+        return Response(status_code=304, headers=headers)
+
+    data = None if revalidating else await thumbnailer.cached(article_id, width, fmt)
+    if data is None:
+        row = (await db.execute(select(Article.image_url).where(Article.id == article_id))).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Article not found")
+        if not row.image_url:
+            raise HTTPException(status_code=404, detail="Article has no image")
+        if revalidating:
+            return Response(status_code=304, headers=headers)
+        # Don't hold a pooled connection while downloading the publisher's image
+        await db.close()
+
+        try:
+            variants = await thumbnailer.generate(article_id, row.image_url)
+        except ThumbnailError:
+            raise HTTPException(status_code=502, detail="Source image could not be fetched")
+        data = variants[(width, fmt)]
+
+    return Response(content=data, media_type=FORMATS[fmt], headers=headers)
+
+
+@router.get(
+    "/{article_id}/summary",
+    response_model=ArticleSummary,
+    responses={
+        202: {"model": SummaryJobStatus},
+        503: {"description": "Summary queue is full"},
+        504: {"description": "Sync-mode summary did not finish within SUMMARY_TIMEOUT"},
+    },
+)
 async def get_summary(
     article_id: UUID,
+    response: Response,
+    mode: Literal["sync", "async"] = Query("sync"),
     db: AsyncSession = Depends(get_db),
     r: redis.Redis = Depends(get_redis),
+    queue: SummaryQueue = Depends(get_summary_queue),
 ):
     article = (
         await db.execute(select(Article).where(Article.id == article_id))
@@ -85,11 +326,45 @@ async def get_summary(
     if not article.content:
         raise HTTPException(status_code=422, detail="Article has no content to summarize")
 
-    cached = await get_cached_summary(article_id, r)
+    # Hand the connection back to the pool before waiting on Redis or the LLM
+    title, content = article.title, article.content
+    # Near-duplicates share the summary cached under their cluster representative
+    summary_id = article.cluster_id or article_id
+    await db.close()
+
+    cached = await get_cached_summary(summary_id, r)
+    response.headers["X-Cache"] = "HIT" if cached else "MISS"
     if cached:
-        return ArticleSummary(id=article.id, title=article.title, summary=cached, cached=True)
+        return ArticleSummary(id=article_id, title=title, summary=cached, cached=True)
+
+    try:
+        job = await queue.submit(summary_id, content, r)
+    except QueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Summary queue is full",
+            headers={"Retry-After": str(settings.summary_retry_after)},
+        )
 
-    summary = await summarize_article(article.content)
-    await cache_summary(article_id, summary, r)
+    if mode == "async":
+        poll_url = _job_poll_url(job.job_id)
+        body = SummaryJobStatus(
+            job_id=job.job_id, article_id=article_id, status="queued", poll_url=poll_url
+        )
+        return JSONResponse(
+            status_code=202,
+            content=body.model_dump(mode="json"),
+            headers={"Location": poll_url, "X-Cache": "MISS"},
+        )
 
-    return ArticleSummary(id=article.id, title=article.title, summary=summary, cached=False)
+    # Shield so a disconnecting client (or the timeout) doesn't cancel a job other callers may share
+    try:
+        with span("llm"):  # queue wait + generation
+            summary = await asyncio.wait_for(asyncio.shield(job.result), settings.summary_timeout)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail="Summary is taking too long; retry with mode=async to poll for it",
+            headers={"Retry-After": str(settings.summary_retry_after)},
+        )
+    return ArticleSummary(id=article_id, title=title, summary=summary, cached=False)
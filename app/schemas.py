@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 
 
 class ArticleListItem(BaseModel):
@@ -17,14 +17,24 @@ class ArticleListItem(BaseModel):
     published_at: datetime | None = None
     search_keyword: str | None = None
     fetched_at: datetime | None = None
+    cluster_id: UUID | None = None
 
     model_config = {"from_attributes": True}
 
+    @computed_field
+    @property
+    def thumbnail_url(self) -> str | None:
+        return f"/articles/{self.id}/thumbnail" if self.image_url else None
+
 
 class ArticleDetail(ArticleListItem):
     content: str | None = None
 
 
+class RelatedArticle(ArticleListItem):
+    score: float
+
+
 class ArticleSummary(BaseModel):
     id: UUID
     title: str
@@ -32,6 +42,15 @@ class ArticleSummary(BaseModel):
     cached: bool
 
 
+class SummaryJobStatus(BaseModel):
+    job_id: str
+    article_id: UUID
+    status: str
+    poll_url: str
+    summary: str | None = None
+    error: str | None = None
+
+
 class PaginatedResponse(BaseModel):
     total: int
     page: int
@@ -39,7 +58,42 @@ class PaginatedResponse(BaseModel):
     results: list[ArticleListItem]
 
 
+class StatBucket(BaseModel):
+    key: str | None
+    count: int
+
+
+class StatDay(BaseModel):
+    day: date
+    count: int
+    with_content: int
+
+
+class ArticleStats(BaseModel):
+    total: int
+    with_content: int
+    content_coverage: float
+    by_source: list[StatBucket]
+    by_keyword: list[StatBucket]
+    by_day: list[StatDay]
+
+
 class FetchResult(BaseModel):
     fetched: int
     skipped: int
     failed: int
+    timings: dict[str, float] = {}
+
+
+class FetchRunStatus(BaseModel):
+    run_id: str
+    status: str
+    keyword: str | None = None
+    trigger: str | None = None
+    status_url: str
+    processed: int | None = None
+    total: int | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    result: FetchResult | None = None
+    error: str | None = None
@@ -0,0 +1,73 @@
+import csv
+import io
+import zlib
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Article
+from app.schemas import ArticleDetail
+
+EXPORT_BATCH_SIZE = 500
+FLUSH_BYTES = 64 * 1024
+EXPORT_FIELDS = list(ArticleDetail.model_fields) + list(ArticleDetail.model_computed_fields)
+
+
+def _ndjson_line(article: ArticleDetail) -> str:
+    return article.model_dump_json() + "\n"
+
+
+def _csv_line(article: ArticleDetail, writer, buf: io.StringIO) -> str:
+    buf.seek(0)
+    buf.truncate()
+    writer.writerow(article.model_dump(mode="json").values())
+    return buf.getvalue()
+
+
+async def export_articles(
+    db: AsyncSession,
+    fmt: str,
+    since: datetime | None = None,
+) -> AsyncIterator[bytes]:
+    """Yield the articles table as NDJSON or CSV chunks, oldest fetch first.
+
+    Rows come from a server-side cursor (`stream` + `yield_per`), so memory stays
+    constant regardless of table size.
+    """
+    query = select(Article).order_by(Article.fetched_at, Article.id)
+    if since:
+        query = query.where(Article.fetched_at > since)
+
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if fmt == "csv":
+        writer.writerow(EXPORT_FIELDS)
+        yield buf.getvalue().encode()
+
+    chunk: list[str] = []
+    size = 0
+    result = await db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    async for article in result.scalars():
+        item = ArticleDetail.model_validate(article)
+        line = _csv_line(item, writer, buf) if fmt == "csv" else _ndjson_line(item)
+        chunk.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield "".join(chunk).encode()
+            chunk, size = [], 0
+        # Streamed rows are never needed again; don't let the identity map grow
+        db.expunge(article)
+
+    if chunk:
+        yield "".join(chunk).encode()
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
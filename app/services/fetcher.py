@@ -1,14 +1,23 @@
+import asyncio
 import logging
-from datetime import datetime
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from contextlib import contextmanager
+from datetime import datetime, timezone
 
 import httpx
-import newspaper
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.models import Article
 from app.schemas import FetchResult
+from app.services.dedup import assign_cluster
+from app.services.partitions import ensure_partitions, month_start, retention_cutoff
+from app.services.related import add_documents
+from app.services.stats import record_articles
+from app.services.thumbnails import thumbnailer
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +37,9 @@ async def fetch_from_marketaux(keyword: str) -> list[dict]:
 
 
 def scrape_article_content(url: str) -> str | None:
+    # newspaper pulls in lxml and friends; only the fetch path should pay for that
+    import newspaper
+
     try:
         art = newspaper.article(url)
         return art.text if art.text else None
@@ -36,41 +48,91 @@ def scrape_article_content(url: str) -> str | None:
         return None
 
 
-async def fetch_and_store_articles(keyword: str, db: AsyncSession) -> FetchResult:
-    articles_data = await fetch_from_marketaux(keyword)
+def parse_published_at(item: dict) -> datetime | None:
+    if item.get("published_at"):
+        try:
+            return datetime.fromisoformat(item["published_at"].replace("Z", "+00:00"))
+        except (ValueError, TypeError):
+            pass
+    # published_at is the partition key, so partitioned tables need a value
+    if settings.articles_partitioned:
+        return datetime.now(timezone.utc)
+    return None
+
+
+@contextmanager
+def _stage(timings: dict[str, float], name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+async def fetch_and_store_articles(
+    keyword: str,
+    db: AsyncSession,
+    progress: Callable[[int, int], Awaitable[None]] | None = None,
+) -> FetchResult:
+    """Fetch, scrape and store new articles for `keyword`.
+
+    `progress(processed, total)` is awaited after each Marketaux item. Per-stage
+    wall time in milliseconds is returned in `FetchResult.timings`.
+    """
+    timings: dict[str, float] = {}
+    with _stage(timings, "marketaux"):
+        articles_data = await fetch_from_marketaux(keyword)
 
-    fetched = 0
     skipped = 0
+    if settings.articles_partitioned:
+        # Months past retention have been archived and dropped; creating their
+        # partitions again would bring them back for the next retention run
+        cutoff = retention_cutoff(settings.retention_months)
+        kept = [item for item in articles_data if month_start(parse_published_at(item)) >= cutoff]
+        skipped = len(articles_data) - len(kept)
+        if skipped:
+            logger.info("Skipping %d articles published before %s", skipped, cutoff)
+        articles_data = kept
+
+        # Short transaction of its own: partition DDL locks articles, and the
+        # insert transaction below stays open for the whole scrape
+        months = [parse_published_at(item) for item in articles_data]
+        with _stage(timings, "partitions"):
+            async with db.bind.begin() as conn:
+                await conn.run_sync(ensure_partitions, months)
+
+    fetched = 0
     failed = 0
+    new_articles = []
+
+    for processed, item in enumerate(articles_data, start=1):
+        if progress:
+            await progress(processed - 1, len(articles_data))
 
-    for item in articles_data:
         external_uuid = item.get("uuid")
         if not external_uuid:
             failed += 1
             continue
 
-        exists = (
-            await db.execute(
-                select(Article.id).where(Article.external_uuid == external_uuid)
-            )
-        ).scalar_one_or_none()
+        with _stage(timings, "lookup"):
+            exists = (
+                await db.execute(
+                    select(Article.id).where(Article.external_uuid == external_uuid)
+                )
+            ).scalar_one_or_none()
 
         if exists:
             skipped += 1
             continue
 
-        content = scrape_article_content(item.get("url", ""))
+        with _stage(timings, "scrape"):
+            # newspaper downloads synchronously; runs triggered from the API share its event loop
+            content = await asyncio.to_thread(scrape_article_content, item.get("url", ""))
 
-        published_at = None
-        if item.get("published_at"):
-            try:
-                published_at = datetime.fromisoformat(
-                    item["published_at"].replace("Z", "+00:00")
-                )
-            except (ValueError, TypeError):
-                pass
+        published_at = parse_published_at(item)
 
         article = Article(
+            id=uuid.uuid4(),
             external_uuid=external_uuid,
             title=item.get("title", ""),
             description=item.get("description"),
@@ -83,9 +145,32 @@ async def fetch_and_store_articles(keyword: str, db: AsyncSession) -> FetchResul
             published_at=published_at,
             search_keyword=keyword,
         )
+        with _stage(timings, "dedup"):
+            await assign_cluster(article, db)
         db.add(article)
+        new_articles.append(article)
         fetched += 1
 
-    await db.commit()
+    with _stage(timings, "store"):
+        await record_articles(new_articles, db)
+        await db.commit()
+    if progress:
+        await progress(len(articles_data), len(articles_data))
+
+    with _stage(timings, "index"):
+        try:
+            docs = [(a.id, f"{a.title}\n{a.content or ''}") for a in new_articles]
+            await asyncio.to_thread(add_documents, docs)
+        except OSError as e:
+            # The index is derived data; scripts/rebuild_related.py restores it
+            logger.warning("Failed to update related-articles index: %s", e)
+    with _stage(timings, "thumbnails"):
+        # Render list thumbnails now so the first page view doesn't pay for the publisher images
+        await thumbnailer.pregenerate([(a.id, a.image_url) for a in new_articles if a.image_url])
     logger.info("Fetch complete: fetched=%d skipped=%d failed=%d", fetched, skipped, failed)
-    return FetchResult(fetched=fetched, skipped=skipped, failed=failed)
+    return FetchResult(
+        fetched=fetched,
+        skipped=skipped,
+        failed=failed,
+        timings={name: round(ms, 1) for name, ms in timings.items()},
+    )
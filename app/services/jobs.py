@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass
+from uuid import UUID
+
+import redis.asyncio as redis
+
+from app.config import settings
+from app.services.cache import cache_summary
+from app.services.summarizer import summarize_article
+from app.timing import span
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the summary queue has no room for another job."""
+
+
+@dataclass
+class SummaryJob:
+    job_id: str
+    article_id: UUID
+    content: str
+    r: redis.Redis
+    result: asyncio.Future
+
+
+async def get_job_state(job_id: str, r: redis.Redis) -> dict | None:
+    with span("redis"):
+        state = await r.hgetall(f"summary_job:{job_id}")
+    return state or None
+
+
+async def set_job_state(job_id: str, r: redis.Redis, **fields: str) -> None:
+    key = f"summary_job:{job_id}"
+    with span("redis"):
+        await r.hset(key, mapping=fields)
+        await r.expire(key, settings.summary_job_ttl)
+
+
+class SummaryQueue:
+    """Bounded in-process queue feeding a fixed pool of summarization workers.
+
+    Job state lives in Redis so any API worker can answer a poll for it.
+    Jobs for an article that is already queued or running are coalesced.
+    """
+
+    def __init__(self, maxsize: int, workers: int):
+        self.maxsize = maxsize
+        self.workers = workers
+        self._queue: asyncio.Queue[SummaryJob] | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._inflight: dict[UUID, SummaryJob] = {}
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._inflight.clear()
+
+    async def submit(self, article_id: UUID, content: str, r: redis.Redis) -> SummaryJob:
+        existing = self._inflight.get(article_id)
+        if existing:
+            return existing
+
+        job = SummaryJob(
+            job_id=uuid.uuid4().hex,
+            article_id=article_id,
+            content=content,
+            r=r,
+            result=asyncio.get_running_loop().create_future(),
+        )
+        # Async-mode callers never await the result; mark failures as retrieved
+        job.result.add_done_callback(lambda f: f.cancelled() or f.exception())
+        if self._queue.full():
+            raise QueueFullError
+
+        # Record state before enqueueing so a worker's "running" can't be overwritten
+        self._inflight[article_id] = job
+        try:
+            await set_job_state(job.job_id, r, article_id=str(article_id), status="queued")
+            self._queue.put_nowait(job)
+        except BaseException as e:
+            # Never leave a job that was not queued registered: later submits would join it
+            self._inflight.pop(article_id, None)
+            if not job.result.done():
+                job.result.set_exception(QueueFullError() if isinstance(e, asyncio.QueueFull) else e)
+            if isinstance(e, asyncio.QueueFull):
+                await self._record(job, status="failed", error="queue full")
+                raise QueueFullError from None
+            raise
+        return job
+
+    async def _record(self, job: SummaryJob, **fields: str) -> None:
+        # A Redis outage must not kill the worker; the caller already has (or gets) the result
+        try:
+            await set_job_state(job.job_id, job.r, **fields)
+        except Exception as e:
+            logger.warning("Failed to record state of summary job %s: %s", job.job_id, e)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._record(job, status="running")
+                try:
+                    summary = await summarize_article(job.content)
+                except Exception as e:
+                    logger.warning("Summary job %s failed: %s", job.job_id, e)
+                    if not job.result.done():
+                        job.result.set_exception(e)
+                    await self._record(job, status="failed", error=str(e))
+                    continue
+
+                if not job.result.done():
+                    job.result.set_result(summary)
+                try:
+                    await cache_summary(job.article_id, summary, job.r)
+                except Exception as e:
+                    # Pollers read the summary from the cache, so for them the job failed
+                    logger.warning("Failed to cache summary for job %s: %s", job.job_id, e)
+                    await self._record(job, status="failed", error=str(e))
+                    continue
+                await self._record(job, status="done")
+            finally:
+                self._inflight.pop(job.article_id, None)
+                self._queue.task_done()
+
+
+summary_queue = SummaryQueue(
+    maxsize=settings.summary_queue_size,
+    workers=settings.summary_workers,
+)
+
+
+async def get_summary_queue() -> SummaryQueue:
+    return summary_queue
@@ -0,0 +1,167 @@
+"""Monthly range partitions of `articles` on `published_at` (PostgreSQL only).
+
+Used when `settings.articles_partitioned` is on. There is no DEFAULT partition:
+it would rule out `DETACH PARTITION ... CONCURRENTLY`, so the fetcher creates
+the partition for a month before inserting into it instead.
+"""
+
+import gzip
+import logging
+import os
+from datetime import date, datetime, timezone
+
+from sqlalchemy import Connection, Engine, text
+
+logger = logging.getLogger(__name__)
+
+
+def month_start(d: date) -> date:
+    # Partition bounds are UTC; an aware datetime's own month can be a different one
+    if isinstance(d, datetime) and d.tzinfo is not None:
+        d = d.astimezone(timezone.utc)
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, n: int) -> date:
+    months = d.year * 12 + d.month - 1 + n
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"articles_{month:%Y_%m}"
+
+
+def partition_ddl(month: date) -> str:
+    start = month_start(month)
+    end = add_months(start, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF articles "
+        f"FOR VALUES FROM ('{start} 00:00:00+00') TO ('{end} 00:00:00+00')"
+    )
+
+
+def ensure_partitions(conn: Connection, months) -> list[str]:
+    """Create any missing partitions for the given months. Returns the names created."""
+    created = []
+    for month in sorted({month_start(m) for m in months}):
+        name = partition_name(month)
+        # to_regclass takes no lock, so the common "already exists" case never touches articles
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+            conn.execute(text(partition_ddl(month)))
+            created.append(name)
+    return created
+
+
+def ensure_future_partitions(conn: Connection, months_ahead: int, today: date | None = None) -> list[str]:
+    start = month_start(today or datetime.now(timezone.utc).date())
+    return ensure_partitions(conn, [add_months(start, n) for n in range(months_ahead + 1)])
+
+
+def _parse_partitions(names) -> list[tuple[str, date]]:
+    return [(name, datetime.strptime(name, "articles_%Y_%m").date()) for name in names]
+
+
+def list_partitions(conn: Connection) -> list[tuple[str, date]]:
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'articles'::regclass ORDER BY c.relname"
+        )
+    ).scalars()
+    return _parse_partitions(rows)
+
+
+def list_detached_partitions(conn: Connection) -> list[tuple[str, date]]:
+    """Former partitions left behind by a retention run that detached but did not drop."""
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_class c "
+            "WHERE c.relkind = 'r' AND c.relname ~ '^articles_[0-9]{4}_[0-9]{2}$' "
+            "AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid) "
+            "ORDER BY c.relname"
+        )
+    ).scalars()
+    return _parse_partitions(rows)
+
+
+def retention_cutoff(keep_months: int, today: date | None = None) -> date:
+    """First day of the oldest month that retention keeps."""
+    return add_months(month_start(today or datetime.now(timezone.utc).date()), -keep_months)
+
+
+def expired_partitions(partitions: list[tuple[str, date]], keep_months: int, today: date) -> list[str]:
+    cutoff = retention_cutoff(keep_months, today)
+    return [name for name, month in partitions if add_months(month, 1) <= cutoff]
+
+
+def archive_partition(conn: Connection, name: str, archive_dir: str) -> str:
+    # Timestamped and opened exclusively: a month archived twice never overwrites the first export
+    path = os.path.join(archive_dir, f"{name}-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.csv.gz")
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        with gzip.open(path, "xb") as f:
+            cursor.copy_expert(f"COPY {name} TO STDOUT WITH CSV HEADER", f)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)  # partial export; the partition is still there to retry
+        raise
+    finally:
+        cursor.close()
+    return path
+
+
+def purge_derived_rows(conn: Connection, name: str) -> None:
+    """Delete the stats rollup and MinHash bands of the articles in table `name`.
+
+    A partition holds exactly one UTC month of published_at, and the rollup's
+    `day` is the UTC date of published_at, so the month's rollup rows go with it.
+    """
+    month = _parse_partitions([name])[0][1]
+    conn.execute(text(f"DELETE FROM minhash_bands WHERE article_id IN (SELECT id FROM {name})"))
+    conn.execute(
+        text("DELETE FROM article_stats WHERE day >= :start AND day < :end"),
+        {"start": month, "end": add_months(month, 1)},
+    )
+
+
+def apply_retention(
+    engine: Engine,
+    keep_months: int,
+    archive_dir: str | None = None,
+    today: date | None = None,
+) -> list[str]:
+    """Detach partitions older than `keep_months`; archive and drop them if `archive_dir` is set.
+
+    DETACH ... CONCURRENTLY only takes a SHARE UPDATE EXCLUSIVE lock on `articles`,
+    so the fetcher can keep inserting while this runs. Partitions are archived
+    before they are detached, so a failed COPY leaves the partition attached and
+    the next run retries it. Tables detached by an earlier run that failed to drop
+    them are archived and dropped too. Once a partition is detached, its month's
+    `article_stats` rows and its articles' `minhash_bands` rows are deleted, so
+    the stats and near-duplicate lookups stop counting articles that are gone.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    if archive_dir:
+        os.makedirs(archive_dir, exist_ok=True)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        expired = expired_partitions(list_partitions(conn), keep_months, today)
+        for name in expired:
+            path = archive_partition(conn, name, archive_dir) if archive_dir else None
+            conn.execute(text(f"ALTER TABLE articles DETACH PARTITION {name} CONCURRENTLY"))
+            purge_derived_rows(conn, name)
+            if path:
+                conn.execute(text(f"DROP TABLE {name}"))
+                logger.info("Archived partition %s to %s", name, path)
+            else:
+                logger.info("Detached partition %s", name)
+
+        if archive_dir:
+            leftovers = expired_partitions(list_detached_partitions(conn), keep_months, today)
+            for name in leftovers:
+                path = archive_partition(conn, name, archive_dir)
+                purge_derived_rows(conn, name)
+                conn.execute(text(f"DROP TABLE {name}"))
+                logger.info("Archived previously detached partition %s to %s", name, path)
+            expired += leftovers
+    return expired
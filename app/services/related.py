@@ -0,0 +1,240 @@
+"""Related-articles index: hashed TF-IDF vectors in append-only memory-mapped files.
+
+Layout under `settings.related_index_dir`:
+
+    CURRENT              name of the live version directory
+    <version>/ids        16-byte article UUIDs, one per row
+    <version>/indptr     int32 CSR row pointers (rows + 1 entries)
+    <version>/indices    int32 hashed feature ids
+    <version>/data       float32 log(1 + tf) weights
+    <version>/df         int32 document frequency per feature
+
+The fetcher appends rows as it ingests. Every uvicorn worker maps the same
+files read-only, so the OS page cache holds a single copy. indptr is written
+last, which makes a row visible only once the row is complete. Rebuilds write
+a new version and then switch CURRENT. There is only one writer at a time:
+whoever holds the fetch run lock, i.e. a fetch run or scripts/rebuild_related.py.
+"""
+
+import os
+import re
+import shutil
+import zlib
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    import numpy as np
+
+N_FEATURES = 1 << 18
+_WORD_RE = re.compile(r"\w\w+")
+
+
+def features(text: str) -> tuple["np.ndarray", "np.ndarray"]:
+    import numpy as np  # numpy/scipy load on first use, not at API or fetcher startup
+
+    buckets = np.fromiter(
+        (zlib.crc32(w.encode()) & (N_FEATURES - 1) for w in _WORD_RE.findall(text.lower())),
+        dtype=np.int32,
+    )
+    indices, counts = np.unique(buckets, return_counts=True)
+    return indices.astype(np.int32), np.log1p(counts).astype(np.float32)
+
+
+def _current_version(root: str) -> str | None:
+    try:
+        with open(os.path.join(root, "CURRENT")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _set_current_version(root: str, version: str) -> None:
+    tmp = os.path.join(root, "CURRENT.tmp")
+    with open(tmp, "w") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(root, "CURRENT"))
+
+
+def _init_version(path: str) -> None:
+    import numpy as np
+
+    os.makedirs(path, exist_ok=True)
+    for name in ("ids", "indices", "data"):
+        open(os.path.join(path, name), "wb").close()
+    np.zeros(1, dtype=np.int32).tofile(os.path.join(path, "indptr"))
+    np.zeros(N_FEATURES, dtype=np.int32).tofile(os.path.join(path, "df"))
+
+
+def _truncate(file: str, size: int) -> None:
+    if os.path.getsize(file) > size:
+        os.truncate(file, size)
+
+
+def _append(path: str, docs: list[tuple[UUID, str]]) -> None:
+    import numpy as np
+
+    indptr_file = os.path.join(path, "indptr")
+    # A torn indptr write can leave a partial int32 at the end
+    _truncate(indptr_file, os.path.getsize(indptr_file) // 4 * 4)
+    indptr = np.fromfile(indptr_file, dtype=np.int32)
+    offset = int(indptr[-1])
+    # Drop anything an earlier append wrote before failing (e.g. ENOSPC) but never
+    # committed to indptr, so the new rows start where indptr says they do
+    _truncate(os.path.join(path, "ids"), (len(indptr) - 1) * 16)
+    _truncate(os.path.join(path, "indices"), offset * 4)
+    _truncate(os.path.join(path, "data"), offset * 4)
+
+    new_indptr = []
+    terms = []
+    with (
+        open(os.path.join(path, "indices"), "ab") as indices_f,
+        open(os.path.join(path, "data"), "ab") as data_f,
+        open(os.path.join(path, "ids"), "ab") as ids_f,
+    ):
+        for article_id, text in docs:
+            indices, data = features(text)
+            indices_f.write(indices.tobytes())
+            data_f.write(data.tobytes())
+            ids_f.write(article_id.bytes)
+            terms.append(indices)
+            offset += len(indices)
+            new_indptr.append(offset)
+
+    with open(indptr_file, "ab") as f:
+        f.write(np.asarray(new_indptr, dtype=np.int32).tobytes())
+
+    # Only count document frequencies for rows that are now committed
+    if terms:
+        df = np.memmap(os.path.join(path, "df"), dtype=np.int32, mode="r+")
+        np.add.at(df, np.concatenate(terms), 1)
+        df.flush()
+        del df
+
+
+def add_documents(docs: list[tuple[UUID, str]], root: str | None = None) -> None:
+    """Append (article_id, title + content) rows to the live index, creating it if needed."""
+    if not docs:
+        return
+    root = root or settings.related_index_dir
+    version = _current_version(root)
+    if version is None:
+        version = "v1"
+        _init_version(os.path.join(root, version))
+        _set_current_version(root, version)
+    _append(os.path.join(root, version), docs)
+
+
+def rebuild(docs, root: str | None = None, batch_size: int = 1000) -> int:
+    """Write a fresh index version from an iterable of (article_id, text) and switch to it."""
+    root = root or settings.related_index_dir
+    previous = _current_version(root)
+    version = f"v{int(previous[1:]) + 1}" if previous else "v1"
+    path = os.path.join(root, version)
+    shutil.rmtree(path, ignore_errors=True)
+    _init_version(path)
+
+    count = 0
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            _append(path, batch)
+            count += len(batch)
+            batch = []
+    _append(path, batch)
+    count += len(batch)
+
+    _set_current_version(root, version)
+    if previous:
+        # Workers that still map the old files keep reading them until they remap
+        shutil.rmtree(os.path.join(root, previous), ignore_errors=True)
+    return count
+
+
+class RelatedIndex:
+    """Read side: maps the live version and answers top-k cosine queries."""
+
+    def __init__(self, root: str | None = None):
+        self.root = root
+        self._key = None
+        # (ids, matrix, idf, norms), swapped in as one unit so concurrent
+        # queries never mix arrays from two versions of the index
+        self._state = None
+
+    def _load(self):
+        root = self.root or settings.related_index_dir
+        version = _current_version(root)
+        if version is None:
+            return None
+        path = os.path.join(root, version)
+        key = (path, os.path.getsize(os.path.join(path, "indptr")))
+        if key == self._key:
+            return self._state
+
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        def mapped(name: str, dtype) -> np.ndarray:
+            file = os.path.join(path, name)
+            size = os.path.getsize(file) // np.dtype(dtype).itemsize
+            if not size:
+                return np.zeros(0, dtype=dtype)
+            return np.memmap(file, dtype=dtype, mode="r", shape=(size,))
+
+        ids = mapped("ids", np.dtype("V16"))
+        indptr = mapped("indptr", np.int32)
+        rows = min(len(ids), len(indptr) - 1)
+        indptr = indptr[: rows + 1]
+        nnz = int(indptr[-1])
+
+        matrix = csr_matrix(
+            (mapped("data", np.float32)[:nnz], mapped("indices", np.int32)[:nnz], indptr),
+            shape=(rows, N_FEATURES),
+            copy=False,
+        )
+        df = mapped("df", np.int32)
+        idf = (np.log((1 + rows) / (1 + df)) + 1).astype(np.float32)
+        # Per-process: one float per row, recomputed only when the index grows
+        norms = np.sqrt(matrix.power(2) @ (idf**2))
+        norms = np.where(norms > 0, norms, 1).astype(np.float32)
+
+        self._state = (ids[:rows], matrix, idf, norms)
+        self._key = key
+        return self._state
+
+    def related(self, article_id: UUID, k: int) -> list[tuple[UUID, float]]:
+        state = self._load()
+        if state is None:
+            return []
+        import numpy as np
+
+        ids, matrix, idf, norms = state
+        matches = np.flatnonzero(ids == np.void(article_id.bytes))
+        if not len(matches):
+            return []
+        row = int(matches[-1])
+
+        # cos(q, d) = sum_t q_t idf_t d_t idf_t / (|q| |d|), batched over all rows at once
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        terms = matrix.indices[start:end]
+        query = np.zeros(N_FEATURES, dtype=np.float32)
+        query[terms] = matrix.data[start:end] * idf[terms] ** 2
+        scores = (matrix @ query) / (norms * norms[row])
+        scores[row] = 0
+
+        k = min(k, len(scores) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(UUID(bytes=ids[i].tobytes()), float(scores[i])) for i in top if scores[i] > 0]
+
+
+related_index = RelatedIndex()
+
+
+async def get_related_index() -> RelatedIndex:
+    return related_index
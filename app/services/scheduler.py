@@ -0,0 +1,223 @@
+"""Fetch runs: one guard shared by cron, the API and the in-process scheduler.
+
+Redis keys:
+    fetch:run_lock       run_id of the run in progress (lease, renewed while it runs)
+    fetch:leader         instance id of the scheduler leader (lease)
+    fetch:last_started   epoch seconds when the last run started, from any trigger
+    fetch_run:{run_id}   status hash: state, progress, timings, result
+
+Leases are plain SET NX EX keys. Renewal and release check ownership in a
+WATCH/MULTI transaction, so a holder whose lease expired cannot extend or
+delete a lease another holder now owns.
+"""
+
+import asyncio
+import logging
+import socket
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+import redis.asyncio as redis
+from redis.exceptions import WatchError
+
+from app.config import settings
+from app.schemas import FetchResult
+from app.services.fetcher import fetch_and_store_articles
+
+logger = logging.getLogger(__name__)
+
+RUN_LOCK_KEY = "fetch:run_lock"
+LEADER_KEY = "fetch:leader"
+LAST_STARTED_KEY = "fetch:last_started"
+
+# Keeps background runs referenced until they finish
+_background: set[asyncio.Task] = set()
+
+
+async def acquire_lease(r: redis.Redis, key: str, owner: str, ttl: int) -> bool:
+    return bool(await r.set(key, owner, nx=True, ex=ttl))
+
+
+async def renew_lease(r: redis.Redis, key: str, owner: str, ttl: int) -> bool:
+    async with r.pipeline() as pipe:
+        try:
+            await pipe.watch(key)
+            if await pipe.get(key) != owner:
+                await pipe.unwatch()
+                return False
+            pipe.multi()
+            pipe.expire(key, ttl)
+            await pipe.execute()
+            return True
+        except WatchError:
+            return False
+
+
+async def release_lease(r: redis.Redis, key: str, owner: str) -> None:
+    async with r.pipeline() as pipe:
+        try:
+            await pipe.watch(key)
+            if await pipe.get(key) != owner:
+                await pipe.unwatch()
+                return
+            pipe.multi()
+            pipe.delete(key)
+            await pipe.execute()
+        except WatchError:
+            pass
+
+
+async def get_run_state(run_id: str, r: redis.Redis) -> dict | None:
+    state = await r.hgetall(f"fetch_run:{run_id}")
+    return state or None
+
+
+async def set_run_state(run_id: str, r: redis.Redis, **fields) -> None:
+    key = f"fetch_run:{run_id}"
+    await r.hset(key, mapping={k: str(v) for k, v in fields.items()})
+    await r.expire(key, settings.fetch_run_ttl)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class LeaseLostError(Exception):
+    """The run lock expired or was taken over while the run was still going."""
+
+
+async def _keep_lease(r: redis.Redis, key: str, owner: str, ttl: int) -> None:
+    """Renew the lease every ttl/3 seconds. Returns only once the lease is lost."""
+    while True:
+        await asyncio.sleep(ttl / 3)
+        try:
+            renewed = await renew_lease(r, key, owner, ttl)
+        except Exception as e:
+            # Transient Redis errors are retried; the lease outlives two missed renewals
+            logger.warning("Failed to renew lease %s: %s", key, e)
+            continue
+        if not renewed:
+            logger.warning("Lost lease %s held by %s", key, owner)
+            return
+
+
+async def execute_run(run_id: str, keyword: str, r: redis.Redis, session_factory: Callable) -> FetchResult:
+    """Run a fetch whose run lock is already held by `run_id`. Always releases the lock.
+
+    If the lock is lost mid-run (e.g. Redis evicted it, or renewals stalled past
+    its TTL) another run may already have started, so this one is cancelled and
+    recorded as failed with `LeaseLostError`.
+    """
+    await r.set(LAST_STARTED_KEY, time.time())
+    await set_run_state(run_id, r, status="running", started_at=_now())
+
+    async def progress(processed: int, total: int) -> None:
+        await set_run_state(run_id, r, processed=processed, total=total)
+
+    async def fetch() -> FetchResult:
+        async with session_factory() as db:
+            return await fetch_and_store_articles(keyword, db, progress)
+
+    fetch_task = asyncio.create_task(fetch())
+    keeper = asyncio.create_task(_keep_lease(r, RUN_LOCK_KEY, run_id, settings.fetch_lock_ttl))
+    try:
+        await asyncio.wait({fetch_task, keeper}, return_when=asyncio.FIRST_COMPLETED)
+        if not fetch_task.done():
+            fetch_task.cancel()
+            await asyncio.gather(fetch_task, return_exceptions=True)
+            raise LeaseLostError(f"Run lock lost; fetch run {run_id} cancelled")
+        result = fetch_task.result()
+    except (Exception, asyncio.CancelledError) as e:
+        await set_run_state(run_id, r, status="failed", error=str(e) or type(e).__name__, finished_at=_now())
+        raise
+    finally:
+        keeper.cancel()
+        fetch_task.cancel()
+        await release_lease(r, RUN_LOCK_KEY, run_id)
+
+    await set_run_state(run_id, r, status="done", result=result.model_dump_json(), finished_at=_now())
+    return result
+
+
+async def claim_run(keyword: str, r: redis.Redis, trigger: str) -> tuple[str, bool]:
+    """Take the run lock for a new run.
+
+    Returns (run_id, True) when claimed, or the in-progress run's id and False.
+    """
+    while True:
+        run_id = uuid.uuid4().hex
+        if await acquire_lease(r, RUN_LOCK_KEY, run_id, settings.fetch_lock_ttl):
+            await set_run_state(run_id, r, status="queued", keyword=keyword, trigger=trigger)
+            return run_id, True
+        current = await r.get(RUN_LOCK_KEY)
+        if current:
+            return current, False
+        # The lock expired between SET NX and GET; try again
+
+
+async def start_run(keyword: str, r: redis.Redis, session_factory: Callable, trigger: str) -> tuple[str, bool]:
+    """Claim the run lock and run the fetch in the background. See `claim_run`."""
+    run_id, claimed = await claim_run(keyword, r, trigger)
+    if claimed:
+        task = asyncio.create_task(execute_run(run_id, keyword, r, session_factory))
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+        # Failures are recorded in the run state; don't also warn about an unretrieved exception
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return run_id, claimed
+
+
+async def stop_background_runs() -> None:
+    """Cancel runs started by `start_run`. Each records itself as failed and releases the run lock."""
+    tasks = list(_background)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class FetchScheduler:
+    """Starts a fetch every `fetch_interval_hours` on whichever replica holds the leader lease."""
+
+    def __init__(self, session_factory: Callable, instance_id: str | None = None):
+        self.session_factory = session_factory
+        self.instance_id = instance_id or f"{socket.gethostname()}:{uuid.uuid4().hex[:8]}"
+        self._task: asyncio.Task | None = None
+        self._redis: redis.Redis | None = None
+
+    async def start(self, r: redis.Redis) -> None:
+        self._redis = r
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._redis:
+            await release_lease(self._redis, LEADER_KEY, self.instance_id)
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.tick(self._redis)
+            except Exception:
+                logger.exception("Scheduler tick failed")
+            await asyncio.sleep(settings.scheduler_poll_seconds)
+
+    async def tick(self, r: redis.Redis) -> str | None:
+        """One scheduling step. Returns the id of a run it started, if any."""
+        ttl = settings.leader_lease_ttl
+        leader = await renew_lease(r, LEADER_KEY, self.instance_id, ttl) or await acquire_lease(
+            r, LEADER_KEY, self.instance_id, ttl
+        )
+        if not leader:
+            return None
+
+        last_started = await r.get(LAST_STARTED_KEY)
+        if last_started and time.time() - float(last_started) < settings.fetch_interval_hours * 3600:
+            return None
+
+        run_id, started = await start_run(settings.fetch_keyword, r, self.session_factory, "scheduler")
+        return run_id if started else None
@@ -0,0 +1,124 @@
+from collections import Counter
+from datetime import date, datetime, timezone
+
+from sqlalchemy import Date, case, cast, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Article, ArticleStat
+from app.schemas import ArticleStats, StatBucket, StatDay
+
+StatKey = tuple[date, str, str]
+
+
+def stat_key(article: Article) -> StatKey:
+    published = article.published_at or datetime.now(timezone.utc)
+    return (
+        published.astimezone(timezone.utc).date(),
+        article.source or "",
+        article.search_keyword or "",
+    )
+
+
+def _upsert(db: AsyncSession):
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    return dialect.insert(ArticleStat)
+
+
+async def record_articles(articles: list[Article], db: AsyncSession) -> None:
+    """Fold newly inserted articles into the rollup, in the caller's transaction."""
+    counts: Counter[StatKey] = Counter()
+    with_content: Counter[StatKey] = Counter()
+    for article in articles:
+        key = stat_key(article)
+        counts[key] += 1
+        with_content[key] += 1 if article.content else 0
+
+    for (day, source, keyword), n in counts.items():
+        stmt = _upsert(db).values(
+            day=day,
+            source=source,
+            search_keyword=keyword,
+            article_count=n,
+            with_content=with_content[(day, source, keyword)],
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ArticleStat.day, ArticleStat.source, ArticleStat.search_keyword],
+            set_={
+                "article_count": ArticleStat.article_count + stmt.excluded.article_count,
+                "with_content": ArticleStat.with_content + stmt.excluded.with_content,
+            },
+        )
+        await db.execute(stmt)
+
+
+def _day_expr(db: AsyncSession):
+    ts = func.coalesce(Article.published_at, Article.fetched_at)
+    if db.bind.dialect.name == "postgresql":
+        return cast(func.timezone("UTC", ts), Date)
+    return func.date(ts)
+
+
+async def rebuild_stats(db: AsyncSession) -> int:
+    """Recompute the whole rollup from `articles`. Returns the number of rollup rows."""
+    day = _day_expr(db)
+    source = func.coalesce(Article.source, "")
+    keyword = func.coalesce(Article.search_keyword, "")
+    aggregate = (
+        select(
+            day,
+            source,
+            keyword,
+            func.count(),
+            func.sum(case((Article.content.is_not(None), 1), else_=0)),
+        )
+        .group_by(day, source, keyword)
+    )
+
+    await db.execute(delete(ArticleStat))
+    await db.execute(
+        insert(ArticleStat).from_select(
+            ["day", "source", "search_keyword", "article_count", "with_content"], aggregate
+        )
+    )
+    await db.commit()
+    return (await db.execute(select(func.count()).select_from(ArticleStat))).scalar()
+
+
+async def get_stats(db: AsyncSession, since: date | None = None) -> ArticleStats:
+    base = select(ArticleStat)
+    if since:
+        base = base.where(ArticleStat.day >= since)
+    rollup = base.subquery()
+
+    total, with_content = (
+        await db.execute(
+            select(
+                func.coalesce(func.sum(rollup.c.article_count), 0),
+                func.coalesce(func.sum(rollup.c.with_content), 0),
+            )
+        )
+    ).one()
+
+    async def buckets(column) -> list[StatBucket]:
+        rows = await db.execute(
+            select(column, func.sum(rollup.c.article_count))
+            .group_by(column)
+            .order_by(func.sum(rollup.c.article_count).desc())
+        )
+        return [StatBucket(key=key or None, count=count) for key, count in rows]
+
+    days = await db.execute(
+        select(rollup.c.day, func.sum(rollup.c.article_count), func.sum(rollup.c.with_content))
+        .group_by(rollup.c.day)
+        .order_by(rollup.c.day)
+    )
+
+    return ArticleStats(
+        total=total,
+        with_content=with_content,
+        content_coverage=with_content / total if total else 0.0,
+        by_source=await buckets(rollup.c.source),
+        by_keyword=await buckets(rollup.c.search_keyword),
+        by_day=[StatDay(day=d, count=c, with_content=w) for d, c, w in days],
+    )
@@ -1,12 +1,25 @@
-import anthropic
+from typing import TYPE_CHECKING
 
 from app.config import settings
 
-client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+if TYPE_CHECKING:
+    import anthropic
+
+client: "anthropic.AsyncAnthropic | None" = None
+
+
+def get_client() -> "anthropic.AsyncAnthropic":
+    # The SDK is imported on first use so API workers only pay for it when summarizing
+    global client
+    if client is None:
+        import anthropic
+
+        client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+    return client
 
 
 async def summarize_article(content: str) -> str:
-    message = await client.messages.create(
+    message = await get_client().messages.create(
         model="claude-haiku-4-5-20251001",
         max_tokens=300,
         messages=[
@@ -0,0 +1,346 @@
+"""Article thumbnails: fetch the publisher image once and keep small resized variants on disk.
+
+Layout under `settings.thumbnail_dir`:
+
+    <article_id>/<width>.webp    one file per (width, format) variant
+    <article_id>/<width>.jpg
+    <article_id>/failed          marker: the source could not be fetched or decoded
+
+All variants are rendered from a single download. Decoding, resizing and encoding
+run on a small dedicated thread pool. Pillow releases the GIL for that work, so the
+event loop stays free and Starlette's threadpool stays free. The mtime of an
+article directory is its LRU clock. Hits bump it, and once the cache is over
+THUMBNAIL_CACHE_BYTES the least recently used directories are removed. API workers
+and the fetch script share the directory, so size and recency are read from disk
+rather than kept in process memory.
+"""
+
+import asyncio
+import hashlib
+import io
+import ipaddress
+import logging
+import os
+import shutil
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from uuid import UUID
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+WIDTHS = (320, 640)
+FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg"}
+_EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+_QUALITY = {"webp": 80, "jpeg": 82}
+
+# Bump when render() output changes so clients drop their immutable copies
+RENDER_VERSION = 1
+FAILURE_TTL = 3600
+MAX_REDIRECTS = 3
+# Hits only bump recency if it is older than this, to avoid a metadata write per hit
+TOUCH_INTERVAL = 60
+# Other processes write to the cache too, so the size estimate is refreshed from disk
+RESCAN_INTERVAL = 300
+# Evict down to this fraction of the limit so the next few writes don't each trigger a scan
+LOW_WATER = 0.9
+
+
+class ThumbnailError(Exception):
+    """The source image could not be fetched or decoded."""
+
+
+def pick_width(requested: int) -> int:
+    """Smallest variant at least `requested` pixels wide, else the largest."""
+    return next((w for w in WIDTHS if w >= requested), WIDTHS[-1])
+
+
+def thumbnail_etag(article_id: UUID, width: int, fmt: str) -> str:
+    # An article's image_url never changes, so the id identifies the source
+    digest = hashlib.sha1(f"{RENDER_VERSION}:{article_id}:{width}:{fmt}".encode()).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def render(source: bytes) -> dict[tuple[int, str], bytes]:
+    """Decode `source` once and encode every (width, format) variant."""
+    from PIL import Image, ImageOps  # only the thumbnail path needs Pillow
+
+    try:
+        with Image.open(io.BytesIO(source)) as img:
+            # JPEG only: let the decoder downscale by 1/2..1/8 while still at least max(WIDTHS) wide
+            img.draft("RGB", (WIDTHS[-1], WIDTHS[-1] * img.height // max(img.width, 1)))
+            img = ImageOps.exif_transpose(img)
+            if img.mode in ("RGBA", "LA", "P"):
+                img = img.convert("RGBA")
+                background = Image.new("RGB", img.size, "white")
+                background.paste(img, mask=img.getchannel("A"))
+                img = background
+            else:
+                img = img.convert("RGB")
+
+            variants = {}
+            aspect = img.height / img.width
+            # Largest first, each step resizing the previous (smaller) image
+            for width in sorted(WIDTHS, reverse=True):
+                if img.width > width:
+                    img = img.resize((width, max(1, round(width * aspect))), Image.Resampling.LANCZOS)
+                for fmt in FORMATS:
+                    buf = io.BytesIO()
+                    img.save(buf, fmt.upper(), quality=_QUALITY[fmt], optimize=True)
+                    variants[(width, fmt)] = buf.getvalue()
+            return variants
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ThumbnailError(f"Undecodable image: {e}") from e
+
+
+async def resolve_host(host: str, port: int) -> list[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+def _is_public(address: str) -> bool:
+    # Drop IPv6 zone ids ("fe80::1%eth0") before parsing
+    return ipaddress.ip_address(address.split("%")[0]).is_global
+
+
+def peer_address(response: httpx.Response) -> str | None:
+    """Address of the socket the response actually came from."""
+    stream = response.extensions.get("network_stream")
+    server_addr = stream.get_extra_info("server_addr") if stream is not None else None
+    return server_addr[0] if server_addr else None
+
+
+async def check_public_url(url: httpx.URL) -> None:
+    """Refuse anything but http(s) to public addresses.
+
+    image_url comes from publishers, and the server fetches it from inside the
+    container network (Redis, Postgres, cloud metadata endpoints).
+    """
+    if url.scheme not in ("http", "https") or not url.host:
+        raise ThumbnailError(f"Refusing to fetch {url}: not an http(s) URL")
+    try:
+        ipaddress.ip_address(url.host)
+        addresses = [url.host]
+    except ValueError:
+        try:
+            addresses = await resolve_host(url.host, url.port or (443 if url.scheme == "https" else 80))
+        except OSError as e:
+            raise ThumbnailError(f"Cannot resolve {url.host}: {e}") from e
+    if not addresses or not all(_is_public(a) for a in addresses):
+        raise ThumbnailError(f"Refusing to fetch {url}: {url.host} is not a public address")
+
+
+async def download(image_url: str) -> bytes:
+    """Fetch the source image, refusing anything over THUMBNAIL_MAX_SOURCE_BYTES.
+
+    Redirects are followed by hand, at most MAX_REDIRECTS, so every hop goes
+    through `check_public_url`. httpx resolves the host again when it connects, so
+    a short-TTL record could point somewhere else by then (DNS rebinding). The
+    address actually connected to is checked before anything from the response
+    is used.
+    """
+    limit = settings.thumbnail_max_source_bytes
+    try:
+        url = httpx.URL(image_url)
+        async with httpx.AsyncClient(follow_redirects=False, timeout=15) as client:
+            for _ in range(MAX_REDIRECTS + 1):
+                await check_public_url(url)
+                async with client.stream("GET", url) as response:
+                    address = peer_address(response)
+                    if address is None or not _is_public(address):
+                        raise ThumbnailError(f"Refusing to fetch {url}: connected to non-public address {address}")
+                    if response.is_redirect:
+                        url = response.url.join(response.headers["location"])
+                        continue
+                    response.raise_for_status()
+                    chunks, size = [], 0
+                    async for chunk in response.aiter_bytes():
+                        size += len(chunk)
+                        if size > limit:
+                            raise ThumbnailError(f"Source image larger than {limit} bytes")
+                        chunks.append(chunk)
+                    return b"".join(chunks)
+    except (httpx.HTTPError, httpx.InvalidURL) as e:
+        raise ThumbnailError(f"Failed to fetch {image_url}: {e}") from e
+    raise ThumbnailError(f"Too many redirects fetching {image_url}")
+
+
+class ThumbnailCache:
+    """Size-bounded disk cache of rendered variants, LRU by article directory mtime."""
+
+    def __init__(self, root: str | None = None, max_bytes: int | None = None):
+        self._root = root
+        self._max_bytes = max_bytes
+        self._bytes: int | None = None
+        self._scanned = 0.0
+
+    @property
+    def root(self) -> str:
+        return self._root or settings.thumbnail_dir
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes or settings.thumbnail_cache_bytes
+
+    def _dir(self, article_id: UUID) -> str:
+        return os.path.join(self.root, str(article_id))
+
+    def path(self, article_id: UUID, width: int, fmt: str) -> str:
+        return os.path.join(self._dir(article_id), f"{width}.{_EXTENSIONS[fmt]}")
+
+    def get(self, article_id: UUID, width: int, fmt: str) -> bytes | None:
+        try:
+            with open(self.path(article_id, width, fmt), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        directory = self._dir(article_id)
+        try:
+            if time.time() - os.stat(directory).st_mtime > TOUCH_INTERVAL:
+                os.utime(directory)
+        except FileNotFoundError:
+            pass  # evicted by another process after the read
+        return data
+
+    def has(self, article_id: UUID, width: int = WIDTHS[0], fmt: str = "jpeg") -> bool:
+        return os.path.exists(self.path(article_id, width, fmt))
+
+    def failed(self, article_id: UUID) -> bool:
+        try:
+            return time.time() - os.stat(os.path.join(self._dir(article_id), "failed")).st_mtime < FAILURE_TTL
+        except FileNotFoundError:
+            return False
+
+    def mark_failed(self, article_id: UUID) -> None:
+        directory = self._dir(article_id)
+        os.makedirs(directory, exist_ok=True)
+        open(os.path.join(directory, "failed"), "w").close()
+
+    def put(self, article_id: UUID, variants: dict[tuple[int, str], bytes]) -> None:
+        """Write all variants at once; readers never see a partly written article."""
+        os.makedirs(self.root, exist_ok=True)
+        tmp = os.path.join(self.root, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp)
+        for (width, fmt), data in variants.items():
+            with open(os.path.join(tmp, f"{width}.{_EXTENSIONS[fmt]}"), "wb") as f:
+                f.write(data)
+
+        directory = self._dir(article_id)
+        shutil.rmtree(directory, ignore_errors=True)  # stale failure marker
+        try:
+            os.rename(tmp, directory)
+        except OSError:
+            # Another process stored this article first
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+
+        if self._bytes is None or time.monotonic() - self._scanned > RESCAN_INTERVAL:
+            self._bytes = self._scan()[1]
+        else:
+            self._bytes += sum(len(data) for data in variants.values())
+        if self._bytes > self.max_bytes:
+            self.evict()
+
+    def _scan(self) -> tuple[list[tuple[float, int, str]], int]:
+        entries = []
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if not entry.is_dir() or entry.name.startswith("."):
+                    continue
+                try:
+                    size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                    entries.append((entry.stat().st_mtime, size, entry.path))
+                except FileNotFoundError:
+                    continue  # evicted concurrently
+        self._scanned = time.monotonic()
+        return entries, sum(size for _, size, _ in entries)
+
+    def evict(self) -> int:
+        """Remove least recently used articles until under the low-water mark. Returns bytes freed."""
+        entries, total = self._scan()
+        target = self.max_bytes * LOW_WATER
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= target:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            freed += size
+        self._bytes = total - freed
+        return freed
+
+
+class Thumbnailer:
+    """Renders thumbnails on a bounded pool, one download per article even under concurrent requests."""
+
+    def __init__(self, cache: ThumbnailCache | None = None):
+        self.cache = cache or ThumbnailCache()
+        self._executor: ThreadPoolExecutor | None = None
+        self._inflight: dict[UUID, asyncio.Future] = {}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.thumbnail_workers, thread_name_prefix="thumbnail"
+            )
+        return self._executor
+
+    async def cached(self, article_id: UUID, width: int, fmt: str) -> bytes | None:
+        return await asyncio.to_thread(self.cache.get, article_id, width, fmt)
+
+    async def generate(self, article_id: UUID, image_url: str) -> dict[tuple[int, str], bytes]:
+        """Fetch and render all variants for an article, joining a render already in flight."""
+        future = self._inflight.get(article_id)
+        if future is None:
+            future = asyncio.ensure_future(self._generate(article_id, image_url))
+            self._inflight[article_id] = future
+            future.add_done_callback(lambda _: self._inflight.pop(article_id, None))
+        # Shield so a disconnecting client doesn't cancel a render other callers may share
+        return await asyncio.shield(future)
+
+    async def _generate(self, article_id: UUID, image_url: str) -> dict[tuple[int, str], bytes]:
+        if await asyncio.to_thread(self.cache.failed, article_id):
+            raise ThumbnailError("Source image failed recently")
+        try:
+            source = await download(image_url)
+            variants = await asyncio.get_running_loop().run_in_executor(self._pool(), render, source)
+        except ThumbnailError:
+            await asyncio.to_thread(self.cache.mark_failed, article_id)
+            raise
+        await asyncio.to_thread(self.cache.put, article_id, variants)
+        return variants
+
+    async def pregenerate(self, articles: list[tuple[UUID, str]]) -> int:
+        """Render thumbnails for (article_id, image_url) pairs not yet cached. Returns how many were made."""
+        semaphore = asyncio.Semaphore(settings.thumbnail_workers * 2)
+
+        async def one(article_id: UUID, image_url: str) -> bool:
+            async with semaphore:
+                if await asyncio.to_thread(self.cache.has, article_id):
+                    return False
+                try:
+                    await self.generate(article_id, image_url)
+                    return True
+                except Exception as e:
+                    # Thumbnails are derived data; the endpoint retries after FAILURE_TTL
+                    logger.warning("Failed to render thumbnail for %s: %s", article_id, e)
+                    return False
+
+        results = await asyncio.gather(*(one(article_id, url) for article_id, url in articles))
+        return sum(results)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+thumbnailer = Thumbnailer()
+
+
+async def get_thumbnailer() -> Thumbnailer:
+    return thumbnailer
@@ -0,0 +1,55 @@
+"""Context-local request timers behind the Server-Timing header.
+
+`ServerTimingMiddleware` installs a fresh `RequestTimings` for each request.
+Code then wraps work in `span("db" | "redis" | "llm")`. Outside a request, or
+when the middleware is off, `span` is a no-op.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestTimings:
+    __slots__ = ("spans", "endpoint_done")
+
+    def __init__(self):
+        self.spans: dict[str, float] = {}
+        self.endpoint_done: float | None = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+
+current_timings: ContextVar[RequestTimings | None] = ContextVar("current_timings", default=None)
+
+
+@contextmanager
+def span(name: str):
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+# Every SQL statement on any engine counts toward the request's "db" span
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_timings.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = current_timings.get()
+    starts = conn.info.get("query_start")
+    if timings is not None and starts:
+        timings.add("db", time.perf_counter() - starts.pop())
@@ -12,11 +12,31 @@ export async function fetchArticle(id) {
   return res.json();
 }
 
+export async function fetchRelated(id, k = 5) {
+  const res = await fetch(`${BASE}/articles/${id}/related?k=${k}`);
+  if (!res.ok) throw new Error(`Failed to fetch related articles: ${res.status}`);
+  return res.json();
+}
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
 export async function fetchSummary(id) {
-  const res = await fetch(`${BASE}/articles/${id}/summary`);
+  const res = await fetch(`${BASE}/articles/${id}/summary?mode=async`);
   if (res.status === 422) throw new Error('Article has no content to summarize');
+  if (res.status === 503) throw new Error('Summarizer is busy, please retry shortly');
   if (!res.ok) throw new Error(`Failed to fetch summary: ${res.status}`);
-  return res.json();
+  if (res.status === 200) return res.json();
+
+  // 202 — poll the job until the summary is ready
+  let job = await res.json();
+  while (job.status === 'queued' || job.status === 'running') {
+    await sleep(1000);
+    const poll = await fetch(`${BASE}${job.poll_url}`);
+    if (!poll.ok) throw new Error(`Failed to poll summary job: ${poll.status}`);
+    job = await poll.json();
+  }
+  if (job.status === 'failed') throw new Error(`Summary failed: ${job.error}`);
+  return { id: job.article_id, summary: job.summary, cached: false };
 }
 
 export async function triggerFetch(keyword = 'markets') {
@@ -26,3 +46,9 @@ export async function triggerFetch(keyword = 'markets') {
   if (!res.ok) throw new Error(`Failed to trigger fetch: ${res.status}`);
   return res.json();
 }
+
+export async function fetchRunStatus(statusUrl) {
+  const res = await fetch(`${BASE}${statusUrl}`);
+  if (!res.ok) throw new Error(`Failed to fetch run status: ${res.status}`);
+  return res.json();
+}
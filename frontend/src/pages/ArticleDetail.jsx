@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { useParams, Link } from 'react-router-dom';
-import { fetchArticle, fetchSummary } from '../api';
+import { fetchArticle, fetchRelated, fetchSummary } from '../api';
 
 export default function ArticleDetail() {
   const { id } = useParams();
@@ -12,12 +12,17 @@ export default function ArticleDetail() {
   const [summaryLoading, setSummaryLoading] = useState(false);
   const [summaryError, setSummaryError] = useState(null);
 
+  const [related, setRelated] = useState([]);
+
   useEffect(() => {
     setLoading(true);
     fetchArticle(id)
       .then(setArticle)
       .catch((e) => setError(e.message))
       .finally(() => setLoading(false));
+    fetchRelated(id)
+      .then(setRelated)
+      .catch(() => setRelated([]));
   }, [id]);
 
   const handleSummary = () => {
@@ -76,6 +81,20 @@ export default function ArticleDetail() {
           </div>
         )}
       </div>
+
+      {related.length > 0 && (
+        <div className="card">
+          <h2>Related stories</h2>
+          <ul>
+            {related.map((r) => (
+              <li key={r.id}>
+                <Link to={`/articles/${r.id}`}>{r.title}</Link>
+                {r.source && <span className="meta"> &middot; {r.source}</span>}
+              </li>
+            ))}
+          </ul>
+        </div>
+      )}
     </div>
   );
 }
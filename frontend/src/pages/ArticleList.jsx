@@ -35,6 +35,17 @@ export default function ArticleList() {
       <h1 style={{ marginBottom: '1rem' }}>Articles ({data.total})</h1>
       {data.results.map((article) => (
         <div className="card" key={article.id}>
+          {article.thumbnail_url && (
+            <img
+              className="thumbnail"
+              src={`${article.thumbnail_url}?w=320`}
+              srcSet={`${article.thumbnail_url}?w=320 1x, ${article.thumbnail_url}?w=640 2x`}
+              width="320"
+              alt=""
+              loading="lazy"
+              onError={(e) => { e.currentTarget.style.display = 'none'; }}
+            />
+          )}
           <h2>
             <Link to={`/articles/${article.id}`}>{article.title}</Link>
           </h2>
@@ -1,22 +1,37 @@
 import { useState } from 'react';
-import { triggerFetch } from '../api';
+import { fetchRunStatus, triggerFetch } from '../api';
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
 
 export default function FetchTrigger() {
   const [keyword, setKeyword] = useState('markets');
   const [loading, setLoading] = useState(false);
-  const [result, setResult] = useState(null);
+  const [run, setRun] = useState(null);
   const [error, setError] = useState(null);
 
-  const handleFetch = () => {
+  const handleFetch = async () => {
     setLoading(true);
     setError(null);
-    setResult(null);
-    triggerFetch(keyword)
-      .then(setResult)
-      .catch((e) => setError(e.message))
-      .finally(() => setLoading(false));
+    setRun(null);
+    try {
+      // The fetch runs in the background; poll its status until it finishes
+      let status = await triggerFetch(keyword);
+      setRun(status);
+      while (status.status === 'queued' || status.status === 'running') {
+        await sleep(1000);
+        status = await fetchRunStatus(status.status_url);
+        setRun(status);
+      }
+      if (status.status === 'failed') setError(`Fetch failed: ${status.error}`);
+    } catch (e) {
+      setError(e.message);
+    } finally {
+      setLoading(false);
+    }
   };
 
+  const result = run?.result;
+
   return (
     <div>
       <h1 style={{ marginBottom: '1rem' }}>Fetch Articles</h1>
@@ -38,6 +53,13 @@ export default function FetchTrigger() {
 
         {error && <p className="error">{error}</p>}
 
+        {run && !result && (
+          <p className="loading" style={{ marginTop: '0.5rem' }}>
+            Run {run.run_id.slice(0, 8)}: {run.status}
+            {run.total ? ` — ${run.processed}/${run.total} articles` : ''}
+          </p>
+        )}
+
         {result && (
           <div className="result-box">
             <p><strong>Fetched:</strong> {result.fetched} new articles</p>
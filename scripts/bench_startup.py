@@ -0,0 +1,77 @@
+"""Startup-time benchmark: import time and peak RSS per entry point.
+
+Each entry point is imported in a fresh interpreter under `python -X importtime`.
+Also checks that heavy dependencies stay out of import graphs that don't need them.
+
+    python scripts/bench_startup.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+ENTRY_POINTS = {
+    "api": "import app.main",
+    "fetch": "import runpy; runpy.run_path('scripts/fetch.py')",
+    "summarizer": "from app.services.summarizer import get_client; get_client()",
+}
+
+# Modules each entry point must not import at startup
+FORBIDDEN = {
+    "api": ["newspaper", "lxml", "anthropic", "numpy", "scipy", "PIL"],
+    "fetch": ["fastapi", "starlette", "anthropic"],
+    "summarizer": ["fastapi", "newspaper"],
+}
+
+PROBE = """
+import resource, sys
+{code}
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+print("leaked:" + ",".join(sorted(m for m in {forbidden!r} if m in sys.modules)))
+"""
+
+
+def measure(name: str) -> tuple[float, int, list[str]]:
+    code = PROBE.format(code=ENTRY_POINTS[name], forbidden=FORBIDDEN[name])
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+
+    # importtime lines: "import time: self [us] | cumulative | imported package"
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            total_us += int(line.split(":", 1)[1].split("|")[0])
+
+    rss_line, leaked_line = proc.stdout.strip().splitlines()[-2:]
+    leaked_line = leaked_line.removeprefix("leaked:")
+    leaked = leaked_line.split(",") if leaked_line else []
+    return total_us / 1000, int(rss_line) // 1024, leaked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'entry point':<12} {'import ms':>10} {'rss MiB':>8}  leaked")
+    for name in ENTRY_POINTS:
+        results = [measure(name) for _ in range(args.runs)]
+        import_ms = statistics.median(r[0] for r in results)
+        rss_mib = statistics.median(r[1] for r in results)
+        leaked = results[0][2]
+        failed |= bool(leaked)
+        print(f"{name:<12} {import_ms:>10.1f} {rss_mib:>8.0f}  {', '.join(leaked) or '-'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
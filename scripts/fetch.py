@@ -2,14 +2,24 @@
 
 import asyncio
 
+import redis.asyncio as redis
+
 from app.config import settings
 from app.database import async_session
-from app.services.fetcher import fetch_and_store_articles
+from app.services.scheduler import claim_run, execute_run
 
 
 async def main():
-    async with async_session() as db:
-        result = await fetch_and_store_articles(settings.fetch_keyword, db)
+    r = redis.from_url(settings.redis_url, decode_responses=True)
+    try:
+        # Shares the run lock with POST /articles/fetch and the in-process scheduler
+        run_id, claimed = await claim_run(settings.fetch_keyword, r, "cron")
+        if not claimed:
+            print(f"Fetch skipped: run {run_id} is already in progress")
+            return
+        result = await execute_run(run_id, settings.fetch_keyword, r, async_session)
+    finally:
+        await r.aclose()
     print(f"Fetch complete: fetched={result.fetched} skipped={result.skipped} failed={result.failed}")
 
 
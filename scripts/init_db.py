@@ -4,9 +4,17 @@ from sqlalchemy import create_engine
 
 from app.config import settings
 from app.database import Base
-from app.models import Article  # noqa: F401 — registers model with Base
+from app.models import Article
+from app.services.partitions import ensure_future_partitions
 
 engine = create_engine(settings.database_url_sync)
 Base.metadata.create_all(engine)
+# create_all skips existing tables, indexes included; add indexes introduced since
+for index in Article.__table__.indexes:
+    index.create(engine, checkfirst=True)
+if settings.articles_partitioned:
+    with engine.begin() as conn:
+        created = ensure_future_partitions(conn, settings.partition_months_ahead)
+    print(f"Article partitions created: {', '.join(created) or 'none'}")
 engine.dispose()
 print("Database tables created successfully.")
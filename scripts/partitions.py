@@ -0,0 +1,43 @@
+"""Maintain monthly partitions of the articles table. Run daily from cron.
+
+    python scripts/partitions.py ensure   # create partitions for the coming months
+    python scripts/partitions.py retain   # detach (or archive + drop) expired partitions
+"""
+
+import argparse
+
+from sqlalchemy import create_engine
+
+from app.config import settings
+from app.services.partitions import apply_retention, ensure_future_partitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain articles partitions")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ensure = sub.add_parser("ensure", help="create partitions for upcoming months")
+    ensure.add_argument("--ahead", type=int, default=settings.partition_months_ahead)
+
+    retain = sub.add_parser("retain", help="detach or archive partitions past retention")
+    retain.add_argument("--keep-months", type=int, default=settings.retention_months)
+    retain.add_argument("--archive-dir", default=settings.archive_dir)
+
+    args = parser.parse_args()
+    if not settings.articles_partitioned:
+        parser.error("ARTICLES_PARTITIONED is off; the articles table is not partitioned")
+
+    engine = create_engine(settings.database_url_sync)
+    if args.command == "ensure":
+        with engine.begin() as conn:
+            created = ensure_future_partitions(conn, args.ahead)
+        print(f"Created partitions: {', '.join(created) or 'none'}")
+    else:
+        expired = apply_retention(engine, args.keep_months, args.archive_dir)
+        action = "Archived" if args.archive_dir else "Detached"
+        print(f"{action} partitions: {', '.join(expired) or 'none'}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
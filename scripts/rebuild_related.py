@@ -0,0 +1,79 @@
+"""Rebuild the related-articles index from the articles table (backfills, recovery).
+
+Holds the fetch run lock for the whole rebuild. Fetch runs append to the live
+index, and anything appended while the new version is being written would be
+lost when it is switched in.
+"""
+
+import asyncio
+import sys
+import threading
+
+import redis.asyncio as redis
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Article
+from app.services.related import rebuild
+from app.services.scheduler import (
+    RUN_LOCK_KEY,
+    LeaseLostError,
+    _keep_lease,
+    _now,
+    claim_run,
+    release_lease,
+    set_run_state,
+)
+
+
+def rebuild_from_db(lost: threading.Event) -> int:
+    engine = create_engine(settings.database_url_sync)
+    try:
+        with Session(engine) as session:
+            rows = session.execute(
+                select(Article.id, Article.title, Article.content)
+                .order_by(Article.fetched_at)
+                .execution_options(yield_per=1000)
+            )
+
+            def docs():
+                for article_id, title, content in rows:
+                    # A fetch may already be appending to the live version; never switch over it
+                    if lost.is_set():
+                        raise LeaseLostError("Run lock lost; related-articles rebuild abandoned")
+                    yield article_id, f"{title}\n{content or ''}"
+
+            return rebuild(docs())
+    finally:
+        engine.dispose()
+
+
+async def main() -> int:
+    r = redis.from_url(settings.redis_url, decode_responses=True)
+    try:
+        run_id, claimed = await claim_run("", r, "rebuild_related")
+        if not claimed:
+            print(f"Rebuild skipped: fetch run {run_id} is in progress")
+            return 1
+        lost = threading.Event()
+        keeper = asyncio.create_task(_keep_lease(r, RUN_LOCK_KEY, run_id, settings.fetch_lock_ttl))
+        keeper.add_done_callback(lambda _: lost.set())
+        try:
+            await set_run_state(run_id, r, status="running", started_at=_now())
+            count = await asyncio.to_thread(rebuild_from_db, lost)
+        except (Exception, asyncio.CancelledError) as e:
+            await set_run_state(run_id, r, status="failed", error=str(e) or type(e).__name__, finished_at=_now())
+            raise
+        finally:
+            keeper.cancel()
+            await release_lease(r, RUN_LOCK_KEY, run_id)
+        await set_run_state(run_id, r, status="done", finished_at=_now())
+    finally:
+        await r.aclose()
+    print(f"Related-articles index rebuilt: {count} articles")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
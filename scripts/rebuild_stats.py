@@ -0,0 +1,16 @@
+"""Rebuild the article_stats rollup from scratch. Use after backfills or manual edits."""
+
+import asyncio
+
+from app.database import async_session
+from app.services.stats import rebuild_stats
+
+
+async def main():
+    async with async_session() as db:
+        rows = await rebuild_stats(db)
+    print(f"Rebuilt article_stats: {rows} rollup rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""Replay captured traffic against a running instance and report latency per route.
+
+    python scripts/replay.py traffic.jsonl --base-url http://localhost:8000 \\
+        [--speed 1 | --speed 4 | --speed max] [--concurrency 32] [--methods GET]
+
+`--speed 1` keeps the original inter-arrival times, `--speed 4` plays back four
+times faster, `--speed max` sends as fast as the concurrency limit allows. When all
+`--concurrency` slots are busy, later requests wait, so an overloaded server
+shows up as lower throughput rather than as an unbounded backlog.
+Only GET requests are replayed by default, so fetch triggers are not re-run.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import defaultdict
+
+import httpx
+
+
+def load_records(path: str, methods: set[str]) -> list[dict]:
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    records = [r for r in records if r["method"] in methods]
+    records.sort(key=lambda r: r["ts"])
+    return records
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+async def replay(
+    records: list[dict],
+    client: httpx.AsyncClient,
+    speed: float | None,
+    concurrency: int,
+) -> list[dict]:
+    """Send every record, honouring original timing scaled by `speed` (None = max speed)."""
+    semaphore = asyncio.Semaphore(concurrency)
+    results = []
+    start = time.perf_counter()
+    first_ts = records[0]["ts"] if records else 0
+
+    async def send(record: dict) -> None:
+        url = record["path"] + (f"?{record['query']}" if record["query"] else "")
+        t0 = time.perf_counter()
+        try:
+            response = await client.request(record["method"], url)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = None
+        finally:
+            semaphore.release()
+        results.append({
+            "route": record.get("route") or record["path"],
+            "status": status,
+            "latency_ms": (time.perf_counter() - t0) * 1000,
+        })
+
+    # Schedule from a single loop so at most `concurrency` requests exist at once
+    tasks = set()
+    for record in records:
+        if speed is not None:
+            delay = (record["ts"] - first_ts) / speed - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await semaphore.acquire()
+        task = asyncio.create_task(send(record))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    return results
+
+
+def report(results: list[dict], elapsed: float) -> str:
+    by_route = defaultdict(list)
+    for result in results:
+        by_route[result["route"]].append(result)
+
+    lines = [
+        f"{'route':<40} {'count':>6} {'errors':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'req/s':>8}"
+    ]
+    for route, items in sorted(by_route.items(), key=lambda kv: -len(kv[1])):
+        latencies = sorted(i["latency_ms"] for i in items)
+        errors = sum(1 for i in items if i["status"] is None or i["status"] >= 500)
+        lines.append(
+            f"{route:<40} {len(items):>6} {errors:>6} {percentile(latencies, 50):>8.1f} "
+            f"{percentile(latencies, 90):>8.1f} {percentile(latencies, 99):>8.1f} "
+            f"{len(items) / elapsed:>8.1f}"
+        )
+    lines.append(f"total: {len(results)} requests in {elapsed:.1f}s ({len(results) / elapsed:.1f} req/s)")
+    return "\n".join(lines)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Replay captured traffic")
+    parser.add_argument("capture")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--speed", default="1", help="playback multiplier, or 'max'")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--methods", default="GET", help="comma-separated methods to replay")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    records = load_records(args.capture, set(args.methods.upper().split(",")))
+    if not records:
+        parser.error("no matching requests in capture file")
+    speed = None if args.speed == "max" else float(args.speed)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        start = time.perf_counter()
+        results = await replay(records, client, speed, args.concurrency)
+        elapsed = time.perf_counter() - start
+    print(report(results, max(elapsed, 1e-9)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
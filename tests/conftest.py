@@ -1,4 +1,6 @@
+import io
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, patch
 
@@ -52,6 +54,53 @@ async def db_session(db_engine):
         await session.rollback()
 
 
+# ---------------------------------------------------------------------------
+# Related-articles index — keep test writes out of the working tree
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(autouse=True)
+def related_index_dir(tmp_path, monkeypatch):
+    from app.config import settings
+
+    path = str(tmp_path / "related_index")
+    monkeypatch.setattr(settings, "related_index_dir", path)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Thumbnails — disk cache in tmp_path, a real (small) source image
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(autouse=True)
+def thumbnail_dir(tmp_path, monkeypatch):
+    from app.config import settings
+
+    path = str(tmp_path / "thumbnails")
+    monkeypatch.setattr(settings, "thumbnail_dir", path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def public_dns(monkeypatch):
+    # Thumbnail downloads refuse private addresses; resolve test hosts to a public one.
+    # Mocked responses have no socket, so report the same address as their peer.
+    async def resolve_host(host, port):
+        return ["93.184.216.34"]
+
+    monkeypatch.setattr("app.services.thumbnails.resolve_host", resolve_host)
+    monkeypatch.setattr("app.services.thumbnails.peer_address", lambda response: "93.184.216.34")
+    return resolve_host
+
+
+@pytest.fixture
+def sample_jpeg():
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (1200, 800), "steelblue").save(buf, "JPEG")
+    return buf.getvalue()
+
+
 # ---------------------------------------------------------------------------
 # Fake Redis
 # ---------------------------------------------------------------------------
@@ -120,9 +169,14 @@ async def sample_article_no_content(db_session):
 
 @pytest_asyncio.fixture
 async def client(db_session, fake_redis):
-    from app.database import get_db
+    from app.database import get_db, get_session_factory
     from app.main import app
     from app.redis import get_redis
+    from app.services.jobs import SummaryQueue, get_summary_queue
+
+    # ASGITransport doesn't run lifespan, so the summary workers are started here
+    queue = SummaryQueue(maxsize=4, workers=1)
+    await queue.start()
 
     async def override_get_db():
         yield db_session
@@ -130,15 +184,31 @@ async def client(db_session, fake_redis):
     async def override_get_redis():
         return fake_redis
 
+    async def override_get_summary_queue():
+        return queue
+
+    @asynccontextmanager
+    async def session_factory():
+        yield db_session
+
+    def override_get_session_factory():
+        return session_factory
+
     app.dependency_overrides[get_db] = override_get_db
     app.dependency_overrides[get_redis] = override_get_redis
+    app.dependency_overrides[get_summary_queue] = override_get_summary_queue
+    app.dependency_overrides[get_session_factory] = override_get_session_factory
 
     # Patch summarizer to avoid real API calls during endpoint tests
-    with patch("app.routers.articles.summarize_article", new_callable=AsyncMock) as mock_summarize:
+    with patch("app.services.jobs.summarize_article", new_callable=AsyncMock) as mock_summarize:
         mock_summarize.return_value = "This is a test summary."
         transport = ASGITransport(app=app)
         async with AsyncClient(transport=transport, base_url="http://test") as ac:
             ac._mock_summarize = mock_summarize  # expose for assertions
+            ac._summary_queue = queue
             yield ac
 
+    # Let workers finish their Redis writes; cancelling fakeredis mid-command wedges it
+    await queue._queue.join()
+    await queue.stop()
     app.dependency_overrides.clear()
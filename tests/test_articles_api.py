@@ -1,7 +1,13 @@
+import asyncio
+import csv
+import io
+import json
 import uuid
 from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
+import respx
 
 from tests.conftest import SAMPLE_ARTICLE_ID
 
@@ -26,6 +32,7 @@ async def test_list_articles_with_data(client, sample_article):
     data = resp.json()
     assert data["total"] == 1
     assert data["results"][0]["title"] == "Test Article Title"
+    assert data["results"][0]["thumbnail_url"] == f"/articles/{SAMPLE_ARTICLE_ID}/thumbnail"
 
 
 async def test_list_articles_pagination(client, sample_article, sample_article_no_content):
@@ -53,6 +60,93 @@ async def test_list_articles_filter_by_keyword(client, sample_article):
     assert resp.json()["total"] == 0
 
 
+async def test_list_articles_filter_by_published_window(client, sample_article, sample_article_no_content):
+    resp = await client.get("/articles?published_after=2026-02-20T00:00:00Z")
+    assert resp.json()["total"] == 1
+    assert resp.json()["results"][0]["title"] == "Test Article Title"
+
+    resp = await client.get("/articles?published_before=2026-02-20T00:00:00Z")
+    assert resp.json()["total"] == 1
+    assert resp.json()["results"][0]["title"] == "Article Without Content"
+
+
+async def test_list_articles_collapse_duplicates(client, db_session, sample_article, sample_article_no_content):
+    sample_article_no_content.cluster_id = SAMPLE_ARTICLE_ID
+    await db_session.commit()
+
+    resp = await client.get("/articles?collapse_duplicates=true")
+    assert resp.json()["total"] == 1
+    assert resp.json()["results"][0]["id"] == str(SAMPLE_ARTICLE_ID)
+
+    resp = await client.get("/articles")
+    assert resp.json()["total"] == 2
+
+
+async def test_list_articles_collapse_duplicates_within_filter(
+    client, db_session, sample_article, sample_article_no_content
+):
+    # The representative is from example.com; its duplicate from another source must still show
+    sample_article_no_content.cluster_id = SAMPLE_ARTICLE_ID
+    sample_article_no_content.source = "other.com"
+    await db_session.commit()
+
+    resp = await client.get("/articles?collapse_duplicates=true&source=other.com")
+    assert resp.json()["total"] == 1
+    assert resp.json()["results"][0]["id"] == str(sample_article_no_content.id)
+
+    resp = await client.get("/articles?collapse_duplicates=true&published_before=2026-02-20T00:00:00Z")
+    assert resp.json()["total"] == 1
+
+
+# ---------------------------------------------------------------------------
+# GET /articles/stats
+# ---------------------------------------------------------------------------
+
+async def test_article_stats(client, db_session, sample_article, sample_article_no_content):
+    from app.services.stats import rebuild_stats
+
+    await rebuild_stats(db_session)
+    resp = await client.get("/articles/stats")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total"] == 2
+    assert data["content_coverage"] == 0.5
+    assert data["by_source"] == [{"key": "example.com", "count": 2}]
+
+
+# ---------------------------------------------------------------------------
+# GET /articles/export
+# ---------------------------------------------------------------------------
+
+async def test_export_ndjson(client, sample_article, sample_article_no_content):
+    resp = await client.get("/articles/export")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert {line["title"] for line in lines} == {"Test Article Title", "Article Without Content"}
+    assert "content" in lines[0]
+
+
+async def test_export_csv(client, sample_article):
+    resp = await client.get("/articles/export?format=csv")
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    assert len(rows) == 1
+    assert rows[0]["external_uuid"] == "ext-uuid-001"
+
+
+async def test_export_since(client, sample_article):
+    resp = await client.get("/articles/export?since=2999-01-01T00:00:00Z")
+    assert resp.status_code == 200
+    assert resp.text == ""
+
+
+async def test_export_gzip(client, sample_article):
+    resp = await client.get("/articles/export?compress=true")
+    assert resp.headers["content-encoding"] == "gzip"
+    # httpx transparently decodes Content-Encoding: gzip
+    assert json.loads(resp.text.splitlines()[0])["title"] == "Test Article Title"
+
+
 # ---------------------------------------------------------------------------
 # GET /articles/{id}
 # ---------------------------------------------------------------------------
@@ -71,6 +165,91 @@ async def test_get_article_not_found(client):
     assert resp.status_code == 404
 
 
+# ---------------------------------------------------------------------------
+# GET /articles/{id}/related
+# ---------------------------------------------------------------------------
+
+async def test_get_related(client, sample_article, sample_article_no_content):
+    from app.services.related import add_documents
+
+    other_id = uuid.UUID("11111111-2222-3333-4444-555555555555")
+    add_documents([
+        (SAMPLE_ARTICLE_ID, "Test article title full article content for testing"),
+        (other_id, "Article without content but about testing articles"),
+    ])
+
+    resp = await client.get(f"/articles/{SAMPLE_ARTICLE_ID}/related")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [r["id"] for r in data] == [str(other_id)]
+    assert data[0]["score"] > 0
+
+
+async def test_get_related_without_index(client, sample_article):
+    resp = await client.get(f"/articles/{SAMPLE_ARTICLE_ID}/related")
+    assert resp.status_code == 200
+    assert resp.json() == []
+
+
+async def test_get_related_not_found(client):
+    resp = await client.get(f"/articles/{uuid.uuid4()}/related")
+    assert resp.status_code == 404
+
+
+# ---------------------------------------------------------------------------
+# GET /articles/{id}/thumbnail
+# ---------------------------------------------------------------------------
+
+@respx.mock
+async def test_get_thumbnail(client, sample_article, sample_jpeg):
+    route = respx.get(sample_article.image_url).mock(return_value=httpx.Response(200, content=sample_jpeg))
+
+    resp = await client.get(f"/articles/{SAMPLE_ARTICLE_ID}/thumbnail", headers={"Accept": "image/webp,*/*"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "image/webp"
+    assert "immutable" in resp.headers["cache-control"]
+    assert resp.headers["vary"] == "Accept"
+
+    # Other variants come from the same download
+    resp = await client.get(f"/articles/{SAMPLE_ARTICLE_ID}/thumbnail?w=600&format=jpeg")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "image/jpeg"
+    assert route.call_count == 1
+
+
+async def test_get_thumbnail_not_modified(client, sample_article):
+    from app.services.thumbnails import thumbnail_etag
+
+    etag = thumbnail_etag(SAMPLE_ARTICLE_ID, 320, "jpeg")
+    resp = await client.get(
+        f"/articles/{SAMPLE_ARTICLE_ID}/thumbnail?format=jpeg", headers={"If-None-Match": etag}
+    )
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+
+    # A matching ETag is no proof the article exists
+    missing = uuid.UUID(int=7)
+    resp = await client.get(
+        f"/articles/{missing}/thumbnail?format=jpeg",
+        headers={"If-None-Match": thumbnail_etag(missing, 320, "jpeg")},
+    )
+    assert resp.status_code == 404
+
+
+async def test_get_thumbnail_no_image(client, sample_article_no_content):
+    resp = await client.get(f"/articles/{sample_article_no_content.id}/thumbnail")
+    assert resp.status_code == 404
+    assert resp.json()["detail"] == "Article has no image"
+
+
+@respx.mock
+async def test_get_thumbnail_source_unavailable(client, sample_article):
+    respx.get(sample_article.image_url).mock(return_value=httpx.Response(503))
+
+    resp = await client.get(f"/articles/{SAMPLE_ARTICLE_ID}/thumbnail")
+    assert resp.status_code == 502
+
+
 # ---------------------------------------------------------------------------
 # GET /articles/{id}/summary
 # ---------------------------------------------------------------------------
@@ -96,6 +275,49 @@ async def test_get_summary_cached(client, sample_article, fake_redis):
     assert resp2.json()["cached"] is True
 
 
+async def test_get_summary_reuses_cluster_summary(client, db_session, sample_article, fake_redis):
+    duplicate_id = uuid.uuid4()
+    from app.models import Article
+
+    db_session.add(Article(
+        id=duplicate_id,
+        external_uuid="ext-uuid-dup",
+        title="Same Story Elsewhere",
+        content="Full article content for testing. " * 20,
+        url="https://other.com/article-1",
+        cluster_id=SAMPLE_ARTICLE_ID,
+    ))
+    await db_session.commit()
+    await fake_redis.set(f"summary:{SAMPLE_ARTICLE_ID}", "Representative summary.")
+
+    resp = await client.get(f"/articles/{duplicate_id}/summary")
+    assert resp.status_code == 200
+    assert resp.json()["summary"] == "Representative summary."
+    assert resp.json()["cached"] is True
+    client._mock_summarize.assert_not_awaited()
+
+
+async def test_get_summary_async_reports_requested_article(client, db_session, sample_article):
+    duplicate_id = uuid.uuid4()
+    from app.models import Article
+
+    db_session.add(Article(
+        id=duplicate_id,
+        external_uuid="ext-uuid-dup",
+        title="Same Story Elsewhere",
+        content="Full article content for testing. " * 20,
+        url="https://other.com/article-1",
+        cluster_id=SAMPLE_ARTICLE_ID,
+    ))
+    await db_session.commit()
+
+    resp = await client.get(f"/articles/{duplicate_id}/summary?mode=async")
+    assert resp.status_code == 202
+    assert resp.json()["article_id"] == str(duplicate_id)
+
+    await client._summary_queue._queue.join()
+
+
 async def test_get_summary_not_found(client):
     fake_id = uuid.uuid4()
     resp = await client.get(f"/articles/{fake_id}/summary")
@@ -108,21 +330,96 @@ async def test_get_summary_no_content(client, sample_article_no_content):
     assert resp.status_code == 422
 
 
+async def test_get_summary_async_returns_job(client, sample_article):
+    resp = await client.get(f"/articles/{SAMPLE_ARTICLE_ID}/summary?mode=async")
+    assert resp.status_code == 202
+    data = resp.json()
+    assert data["status"] == "queued"
+    assert resp.headers["location"] == data["poll_url"]
+
+    await client._summary_queue._queue.join()
+
+    poll = await client.get(data["poll_url"])
+    assert poll.status_code == 200
+    assert poll.json()["status"] == "done"
+    assert poll.json()["summary"] == "This is a test summary."
+
+
+async def test_get_summary_async_cache_hit_returns_200(client, sample_article, fake_redis):
+    await fake_redis.set(f"summary:{SAMPLE_ARTICLE_ID}", "Already cached.")
+    resp = await client.get(f"/articles/{SAMPLE_ARTICLE_ID}/summary?mode=async")
+    assert resp.status_code == 200
+    assert resp.json()["cached"] is True
+
+
+async def test_get_summary_queue_full(client, sample_article):
+    from app.services.jobs import QueueFullError
+
+    with patch.object(client._summary_queue, "submit", side_effect=QueueFullError):
+        resp = await client.get(f"/articles/{SAMPLE_ARTICLE_ID}/summary")
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "5"
+
+
+async def test_get_summary_sync_times_out(client, sample_article, monkeypatch):
+    from app.config import settings
+
+    async def slow(content):
+        await asyncio.sleep(1)
+        return "Late summary."
+
+    monkeypatch.setattr(settings, "summary_timeout", 0.05)
+    client._mock_summarize.side_effect = slow
+    resp = await client.get(f"/articles/{SAMPLE_ARTICLE_ID}/summary")
+    assert resp.status_code == 504
+    assert resp.headers["retry-after"] == "5"
+
+
+async def test_get_summary_job_not_found(client):
+    resp = await client.get("/articles/summary-jobs/does-not-exist")
+    assert resp.status_code == 404
+
+
 # ---------------------------------------------------------------------------
 # POST /articles/fetch
 # ---------------------------------------------------------------------------
 
 async def test_trigger_fetch(client):
     with patch(
-        "app.routers.articles.fetch_and_store_articles",
+        "app.services.scheduler.fetch_and_store_articles",
         new_callable=AsyncMock,
     ) as mock_fetch:
         from app.schemas import FetchResult
-        mock_fetch.return_value = FetchResult(fetched=3, skipped=1, failed=0)
+        mock_fetch.return_value = FetchResult(fetched=3, skipped=1, failed=0, timings={"scrape": 12.5})
 
         resp = await client.post("/articles/fetch?keyword=gold")
-        assert resp.status_code == 200
-        data = resp.json()
-        assert data["fetched"] == 3
-        assert data["skipped"] == 1
-        assert data["failed"] == 0
+        assert resp.status_code == 202
+        run = resp.json()
+        assert run["status"] == "queued"
+        assert run["keyword"] == "gold"
+
+        for _ in range(50):
+            status = (await client.get(run["status_url"])).json()
+            if status["status"] == "done":
+                break
+            await asyncio.sleep(0.01)
+
+        assert status["result"]["fetched"] == 3
+        assert status["result"]["skipped"] == 1
+        assert status["result"]["timings"] == {"scrape": 12.5}
+        assert status["started_at"] and status["finished_at"]
+
+
+async def test_trigger_fetch_returns_in_progress_run(client, fake_redis):
+    await fake_redis.set("fetch:run_lock", "running-run")
+    await fake_redis.hset("fetch_run:running-run", mapping={"status": "running", "keyword": "markets"})
+
+    resp = await client.post("/articles/fetch?keyword=gold")
+    assert resp.status_code == 202
+    assert resp.json()["run_id"] == "running-run"
+    assert resp.json()["status"] == "running"
+
+
+async def test_get_fetch_run_not_found(client):
+    resp = await client.get("/articles/fetch/does-not-exist")
+    assert resp.status_code == 404
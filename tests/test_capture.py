@@ -0,0 +1,43 @@
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.middleware.capture import TrafficCaptureMiddleware
+from tests.conftest import SAMPLE_ARTICLE_ID
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _captured_client(tmp_path, sample_rate=1.0):
+    from app.main import app
+
+    path = tmp_path / "traffic.jsonl"
+    wrapped = TrafficCaptureMiddleware(app, path=str(path), sample_rate=sample_rate)
+    return path, AsyncClient(transport=ASGITransport(app=wrapped), base_url="http://test")
+
+
+async def test_capture_records_request(client, sample_article, tmp_path):
+    path, captured = await _captured_client(tmp_path)
+    async with captured:
+        await captured.get("/articles?page=1")
+        await captured.get(f"/articles/{SAMPLE_ARTICLE_ID}/summary")
+        await captured.get(f"/articles/{SAMPLE_ARTICLE_ID}/summary")
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 3
+    assert records[0]["method"] == "GET"
+    assert records[0]["path"] == "/articles"
+    assert records[0]["query"] == "page=1"
+    assert records[0]["status"] == 200
+    assert records[0]["cache_hit"] is None
+    assert records[1]["route"] == "/articles/{article_id}/summary"
+    assert [r["cache_hit"] for r in records[1:]] == [False, True]
+    assert all(r["duration_ms"] >= 0 for r in records)
+
+
+async def test_capture_sampling_off(client, tmp_path):
+    path, captured = await _captured_client(tmp_path, sample_rate=0.0)
+    async with captured:
+        await captured.get("/health")
+    assert path.read_text() == ""
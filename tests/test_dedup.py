@@ -0,0 +1,66 @@
+import random
+from unittest.mock import patch
+
+import httpx
+import pytest
+import respx
+from sqlalchemy import select
+
+from app.models import Article, MinhashBand
+from app.services.dedup import BANDS, bands, minhash, pack, similarity, unpack
+from app.services.fetcher import MARKETAUX_URL, fetch_and_store_articles
+from tests.test_fetcher import MARKETAUX_RESPONSE
+
+_rng = random.Random(1)
+_VOCAB = [f"word{i}" for i in range(3000)]
+_WORDS = [_rng.choice(_VOCAB) for _ in range(500)]
+
+STORY = " ".join(_WORDS)
+# The same wire story lightly edited: ~2% of words changed
+REWRITE = " ".join(_rng.choice(_VOCAB) if i % 50 == 7 else w for i, w in enumerate(_WORDS))
+OTHER = " ".join(_rng.choice(_VOCAB) for _ in range(500))
+
+
+def test_minhash_similarity_tracks_overlap():
+    assert similarity(minhash(STORY), minhash(STORY)) == 1.0
+    assert similarity(minhash(STORY), minhash(REWRITE)) >= 0.7
+    assert similarity(minhash(STORY), minhash(OTHER)) < 0.1
+
+
+def test_minhash_empty_text():
+    assert minhash("") is None
+    assert minhash("two words") is not None
+
+
+def test_signature_round_trip_and_bands():
+    signature = minhash(STORY)
+    assert list(unpack(pack(signature))) == signature
+    assert [b for b, _ in bands(signature)] == list(range(BANDS))
+
+
+@pytest.mark.asyncio
+@respx.mock
+@patch("app.services.fetcher.scrape_article_content", side_effect=[STORY, REWRITE])
+async def test_fetch_clusters_near_duplicates(mock_scrape, db_session):
+    respx.get(MARKETAUX_URL).mock(return_value=httpx.Response(200, json=MARKETAUX_RESPONSE))
+
+    await fetch_and_store_articles("markets", db_session)
+
+    rows = (await db_session.execute(select(Article).order_by(Article.published_at))).scalars().all()
+    assert rows[0].cluster_id == rows[0].id
+    assert rows[1].cluster_id == rows[0].id
+
+    band_rows = (await db_session.execute(select(MinhashBand))).scalars().all()
+    assert len(band_rows) == 2 * BANDS
+
+
+@pytest.mark.asyncio
+@respx.mock
+@patch("app.services.fetcher.scrape_article_content", side_effect=[STORY, OTHER])
+async def test_fetch_keeps_distinct_stories_apart(mock_scrape, db_session):
+    respx.get(MARKETAUX_URL).mock(return_value=httpx.Response(200, json=MARKETAUX_RESPONSE))
+
+    await fetch_and_store_articles("markets", db_session)
+
+    rows = (await db_session.execute(select(Article))).scalars().all()
+    assert all(r.cluster_id == r.id for r in rows)
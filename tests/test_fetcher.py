@@ -1,4 +1,5 @@
-from unittest.mock import MagicMock, patch
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
@@ -6,6 +7,7 @@ import respx
 from sqlalchemy import select
 
 from app.models import Article
+from app.services.partitions import month_start
 from app.services.fetcher import (
     MARKETAUX_URL,
     fetch_and_store_articles,
@@ -79,7 +81,7 @@ async def test_fetch_from_marketaux_http_error():
 # scrape_article_content
 # ---------------------------------------------------------------------------
 
-@patch("app.services.fetcher.newspaper.article")
+@patch("newspaper.article")
 def test_scrape_article_content_success(mock_article):
     mock_result = MagicMock()
     mock_result.text = "Full article text here."
@@ -90,7 +92,7 @@ def test_scrape_article_content_success(mock_article):
     mock_article.assert_called_once_with("https://example.com/article")
 
 
-@patch("app.services.fetcher.newspaper.article")
+@patch("newspaper.article")
 def test_scrape_article_content_returns_none_on_failure(mock_article):
     mock_article.side_effect = Exception("Connection timeout")
 
@@ -98,7 +100,7 @@ def test_scrape_article_content_returns_none_on_failure(mock_article):
     assert result is None
 
 
-@patch("app.services.fetcher.newspaper.article")
+@patch("newspaper.article")
 def test_scrape_article_content_returns_none_on_empty_text(mock_article):
     mock_result = MagicMock()
     mock_result.text = ""
@@ -158,3 +160,53 @@ async def test_fetch_and_store_articles_missing_uuid(db_session):
     result = await fetch_and_store_articles("markets", db_session)
     assert result.failed == 1
     assert result.fetched == 0
+
+
+@pytest.mark.asyncio
+@respx.mock
+@patch("app.services.fetcher.scrape_article_content", return_value="Content.")
+async def test_fetch_and_store_articles_reports_progress_and_timings(mock_scrape, db_session):
+    respx.get(MARKETAUX_URL).mock(return_value=httpx.Response(200, json=MARKETAUX_RESPONSE))
+    progress = AsyncMock()
+
+    result = await fetch_and_store_articles("markets", db_session, progress)
+
+    assert progress.await_args_list[-1].args == (2, 2)
+    assert {"marketaux", "scrape", "store"} <= result.timings.keys()
+
+
+@pytest.mark.asyncio
+@respx.mock
+@patch("app.services.fetcher.scrape_article_content", return_value="Content.")
+async def test_fetch_and_store_articles_pregenerates_thumbnails(mock_scrape, db_session, sample_jpeg):
+    from app.services.thumbnails import thumbnailer
+
+    respx.get(MARKETAUX_URL).mock(return_value=httpx.Response(200, json=MARKETAUX_RESPONSE))
+    respx.get("https://example.com/one.jpg").mock(return_value=httpx.Response(200, content=sample_jpeg))
+
+    result = await fetch_and_store_articles("markets", db_session)
+
+    article = (await db_session.execute(select(Article).where(Article.external_uuid == "uuid-001"))).scalar_one()
+    assert thumbnailer.cache.has(article.id)
+    assert "thumbnails" in result.timings
+
+
+@pytest.mark.asyncio
+@respx.mock
+@patch("app.services.fetcher.ensure_partitions")
+@patch("app.services.fetcher.scrape_article_content", return_value="Content.")
+async def test_fetch_skips_articles_past_retention(mock_scrape, mock_ensure, db_session, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "articles_partitioned", True)
+    monkeypatch.setattr(settings, "retention_months", 600)
+    old = {**MARKETAUX_RESPONSE["data"][0], "uuid": "uuid-old", "published_at": "1970-01-15T00:00:00Z"}
+    respx.get(MARKETAUX_URL).mock(
+        return_value=httpx.Response(200, json={"data": [old, *MARKETAUX_RESPONSE["data"]]})
+    )
+
+    result = await fetch_and_store_articles("markets", db_session)
+
+    assert (result.fetched, result.skipped) == (2, 1)
+    months = mock_ensure.call_args.args[1]
+    assert {month_start(m) for m in months} == {date(2026, 2, 1)}
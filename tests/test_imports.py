@@ -0,0 +1,21 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def _loaded(code: str, modules: list[str]) -> list[str]:
+    probe = f"import sys\n{code}\nprint(','.join(m for m in {modules!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+@pytest.mark.parametrize(
+    "code, forbidden",
+    [
+        ("import app.main", ["newspaper", "lxml", "anthropic", "numpy", "scipy", "PIL"]),
+        ("import app.services.fetcher, app.database", ["fastapi", "anthropic", "numpy", "scipy", "PIL"]),
+    ],
+)
+def test_entry_point_import_graph(code, forbidden):
+    assert _loaded(code, forbidden) == []
@@ -0,0 +1,98 @@
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.jobs import QueueFullError, SummaryQueue, get_job_state
+
+pytestmark = pytest.mark.asyncio
+
+
+ARTICLE_ID = uuid.UUID("aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee")
+
+
+@patch("app.services.jobs.summarize_article", new_callable=AsyncMock)
+async def test_job_runs_and_caches_summary(mock_summarize, fake_redis):
+    mock_summarize.return_value = "Queued summary."
+    queue = SummaryQueue(maxsize=2, workers=1)
+    await queue.start()
+
+    job = await queue.submit(ARTICLE_ID, "Content.", fake_redis)
+    assert await job.result == "Queued summary."
+    assert await fake_redis.get(f"summary:{ARTICLE_ID}") == "Queued summary."
+    assert (await get_job_state(job.job_id, fake_redis))["status"] == "done"
+
+    await queue.stop()
+
+
+@patch("app.services.jobs.summarize_article", new_callable=AsyncMock)
+async def test_job_failure_is_recorded(mock_summarize, fake_redis):
+    mock_summarize.side_effect = Exception("API down")
+    queue = SummaryQueue(maxsize=2, workers=1)
+    await queue.start()
+
+    job = await queue.submit(ARTICLE_ID, "Content.", fake_redis)
+    with pytest.raises(Exception, match="API down"):
+        await job.result
+    state = await get_job_state(job.job_id, fake_redis)
+    assert state["status"] == "failed"
+    assert state["error"] == "API down"
+
+    await queue.stop()
+
+
+async def test_submit_coalesces_same_article(fake_redis):
+    queue = SummaryQueue(maxsize=2, workers=0)
+    await queue.start()
+
+    first = await queue.submit(ARTICLE_ID, "Content.", fake_redis)
+    second = await queue.submit(ARTICLE_ID, "Content.", fake_redis)
+    assert first is second
+
+    await queue.stop()
+
+
+async def test_submit_sheds_load_when_full(fake_redis):
+    queue = SummaryQueue(maxsize=1, workers=0)
+    await queue.start()
+
+    await queue.submit(uuid.uuid4(), "One.", fake_redis)
+    with pytest.raises(QueueFullError):
+        await queue.submit(uuid.uuid4(), "Two.", fake_redis)
+
+    await queue.stop()
+
+
+@patch("app.services.jobs.summarize_article", new_callable=AsyncMock)
+async def test_redis_errors_do_not_kill_worker(mock_summarize, fake_redis):
+    mock_summarize.side_effect = [Exception("API down"), "Second summary."]
+    queue = SummaryQueue(maxsize=2, workers=1)
+    await queue.start()
+
+    first = await queue.submit(ARTICLE_ID, "Content.", fake_redis)
+    second = await queue.submit(uuid.uuid4(), "Content.", fake_redis)
+    # Break job-state writes before the worker picks up either job
+    with patch.object(fake_redis, "hset", AsyncMock(side_effect=ConnectionError("redis down"))):
+        with pytest.raises(Exception, match="API down"):
+            await asyncio.wait_for(first.result, 1)
+        assert await asyncio.wait_for(second.result, 1) == "Second summary."
+
+    await queue.stop()
+
+
+@patch("app.services.jobs.summarize_article", new_callable=AsyncMock)
+async def test_failed_state_write_does_not_poison_article(mock_summarize, fake_redis):
+    mock_summarize.return_value = "Summary."
+    queue = SummaryQueue(maxsize=2, workers=1)
+    await queue.start()
+
+    with patch.object(fake_redis, "hset", AsyncMock(side_effect=ConnectionError("redis down"))):
+        with pytest.raises(ConnectionError):
+            await queue.submit(ARTICLE_ID, "Content.", fake_redis)
+
+    job = await queue.submit(ARTICLE_ID, "Content.", fake_redis)
+    assert await asyncio.wait_for(job.result, 1) == "Summary."
+
+    await queue._queue.join()
+    await queue.stop()
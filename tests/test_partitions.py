@@ -0,0 +1,108 @@
+import gzip
+import os
+import subprocess
+import sys
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import insert, select, text
+
+from app.models import ArticleStat, MinhashBand
+from app.services.partitions import (
+    add_months,
+    archive_partition,
+    expired_partitions,
+    month_start,
+    partition_ddl,
+    partition_name,
+    purge_derived_rows,
+    retention_cutoff,
+)
+
+
+def test_add_months_wraps_year():
+    assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+def test_partition_ddl_bounds():
+    ddl = partition_ddl(date(2026, 12, 15))
+    assert partition_name(month_start(date(2026, 12, 15))) == "articles_2026_12"
+    assert "articles_2026_12 PARTITION OF articles" in ddl
+    assert "FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')" in ddl
+
+
+def test_expired_partitions_keeps_window():
+    partitions = [
+        ("articles_2025_12", date(2025, 12, 1)),
+        ("articles_2026_01", date(2026, 1, 1)),
+        ("articles_2026_02", date(2026, 2, 1)),
+    ]
+    # Keeping 2 months from mid-March keeps January onward
+    assert expired_partitions(partitions, keep_months=2, today=date(2026, 3, 15)) == ["articles_2025_12"]
+
+
+def test_retention_cutoff_is_oldest_kept_month():
+    assert retention_cutoff(2, today=date(2026, 3, 15)) == date(2026, 1, 1)
+
+
+def test_month_start_uses_utc_month():
+    eastern = timezone(timedelta(hours=-5))
+    assert month_start(datetime(2026, 2, 28, 20, 0, tzinfo=eastern)) == date(2026, 3, 1)
+    assert month_start(datetime(2026, 3, 1, 2, 0, tzinfo=timezone(timedelta(hours=5)))) == date(2026, 2, 1)
+
+
+def test_partitioned_table_ddl():
+    # The model picks its shape at import time, so compile it in a fresh interpreter
+    probe = (
+        "from sqlalchemy.dialects import postgresql\n"
+        "from sqlalchemy.schema import CreateTable\n"
+        "from app.models import Article\n"
+        "print(CreateTable(Article.__table__).compile(dialect=postgresql.dialect()))\n"
+        "print(sorted(i.name for i in Article.__table__.indexes))"
+    )
+    env = {**os.environ, "ARTICLES_PARTITIONED": "true"}
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True, env=env)
+    ddl = " ".join(out.stdout.split())
+    assert "PARTITION BY RANGE (published_at)" in ddl
+    assert "PRIMARY KEY (id, published_at)" in ddl
+    assert "UNIQUE (external_uuid, published_at)" in ddl
+    assert "ix_articles_fetched_at_id" in ddl
+
+
+def test_archive_never_overwrites(tmp_path, monkeypatch):
+    conn = MagicMock()
+    cursor = conn.connection.dbapi_connection.cursor.return_value
+    cursor.copy_expert.side_effect = lambda sql, f: f.write(b"id\n")
+    stamps = iter([datetime(2026, 3, 1, 4, 0, 0), datetime(2026, 3, 1, 4, 0, 1)])
+    monkeypatch.setattr(
+        "app.services.partitions.datetime", MagicMock(now=lambda tz: next(stamps), strptime=datetime.strptime)
+    )
+
+    first = archive_partition(conn, "articles_2025_12", str(tmp_path))
+    second = archive_partition(conn, "articles_2025_12", str(tmp_path))
+
+    assert first != second
+    assert sorted(os.listdir(tmp_path)) == [os.path.basename(first), os.path.basename(second)]
+    with gzip.open(first) as f:
+        assert f.read() == b"id\n"
+
+
+@pytest.mark.asyncio
+async def test_purge_derived_rows_drops_the_months_rollup_and_bands(db_engine):
+    gone, kept = uuid.uuid4(), uuid.uuid4()
+    async with db_engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE articles_2025_12 (id CHAR(32))"))
+        await conn.execute(text("INSERT INTO articles_2025_12 VALUES (:id)"), {"id": gone.hex})
+        bands = [{"band": 0, "value": 1, "article_id": article_id} for article_id in (gone, kept)]
+        await conn.execute(insert(MinhashBand), bands)
+        days = [date(2025, 11, 30), date(2025, 12, 1), date(2025, 12, 31), date(2026, 1, 1)]
+        await conn.execute(insert(ArticleStat), [{"day": d, "article_count": 1, "with_content": 0} for d in days])
+
+        await conn.run_sync(purge_derived_rows, "articles_2025_12")
+
+        assert (await conn.execute(select(MinhashBand.article_id))).scalars().all() == [kept]
+        days = (await conn.execute(select(ArticleStat.day).order_by(ArticleStat.day))).scalars().all()
+        assert days == [date(2025, 11, 30), date(2026, 1, 1)]
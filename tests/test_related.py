@@ -0,0 +1,60 @@
+import os
+import uuid
+
+from app.services.related import RelatedIndex, add_documents, features, rebuild
+
+IDS = [uuid.UUID(int=i) for i in range(1, 5)]
+TEXTS = [
+    "Stocks rally as inflation data cools and bond yields fall",
+    "Bond yields fall after cooler inflation data lifts stocks",
+    "Storm closes northern ports and delays container shipping",
+    "Ports reopen after storm as shipping backlog clears",
+]
+
+
+def test_features_are_deduplicated_and_sorted():
+    indices, data = features("gold gold silver")
+    assert len(indices) == 2
+    assert list(indices) == sorted(indices)
+    assert sorted(data.round(3)) == [0.693, 1.099]
+
+
+def test_related_ranks_similar_story_first(related_index_dir):
+    add_documents(list(zip(IDS, TEXTS)))
+    index = RelatedIndex()
+
+    results = index.related(IDS[0], k=3)
+    assert results[0][0] == IDS[1]
+    assert IDS[0] not in [article_id for article_id, _ in results]
+
+
+def test_related_sees_appended_rows(related_index_dir):
+    index = RelatedIndex()
+    assert index.related(IDS[2], k=3) == []
+
+    add_documents(list(zip(IDS[:3], TEXTS[:3])))
+    assert IDS[3] not in [article_id for article_id, _ in index.related(IDS[2], k=3)]
+
+    add_documents([(IDS[3], TEXTS[3])])
+    assert index.related(IDS[2], k=1)[0][0] == IDS[3]
+
+
+def test_rebuild_switches_version(related_index_dir):
+    add_documents([(IDS[0], TEXTS[0])])
+    assert rebuild(zip(IDS, TEXTS)) == 4
+    assert RelatedIndex().related(IDS[3], k=1)[0][0] == IDS[2]
+
+
+def test_append_recovers_from_partial_write(related_index_dir):
+    add_documents([(IDS[0], TEXTS[0]), (IDS[1], TEXTS[1])])
+    # Simulate an append that died (e.g. ENOSPC) before committing indptr
+    version = os.path.join(related_index_dir, "v1")
+    for name, junk in (("indices", b"\x01\x02\x03"), ("data", b"\x04\x05"), ("ids", b"\x06" * 20)):
+        with open(os.path.join(version, name), "ab") as f:
+            f.write(junk)
+
+    add_documents([(IDS[2], TEXTS[2]), (IDS[3], TEXTS[3])])
+
+    index = RelatedIndex()
+    assert index.related(IDS[0], k=1)[0][0] == IDS[1]
+    assert index.related(IDS[3], k=1)[0][0] == IDS[2]
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.schemas import FetchResult
+from app.services.scheduler import (
+    LAST_STARTED_KEY,
+    LEADER_KEY,
+    LeaseLostError,
+    RUN_LOCK_KEY,
+    FetchScheduler,
+    acquire_lease,
+    claim_run,
+    execute_run,
+    get_run_state,
+    release_lease,
+    renew_lease,
+    start_run,
+    stop_background_runs,
+)
+
+pytestmark = pytest.mark.asyncio
+
+
+@asynccontextmanager
+async def _no_session():
+    yield None
+
+
+async def test_lease_ownership(fake_redis):
+    assert await acquire_lease(fake_redis, "lease", "a", 30)
+    assert not await acquire_lease(fake_redis, "lease", "b", 30)
+    assert not await renew_lease(fake_redis, "lease", "b", 30)
+    assert await renew_lease(fake_redis, "lease", "a", 30)
+
+    await release_lease(fake_redis, "lease", "b")
+    assert await fake_redis.get("lease") == "a"
+    await release_lease(fake_redis, "lease", "a")
+    assert await fake_redis.get("lease") is None
+
+
+async def test_claim_run_prevents_overlap(fake_redis):
+    first, claimed = await claim_run("markets", fake_redis, "cron")
+    assert claimed
+
+    second, claimed = await claim_run("markets", fake_redis, "api")
+    assert not claimed
+    assert second == first
+
+
+@patch("app.services.scheduler.fetch_and_store_articles", new_callable=AsyncMock)
+async def test_execute_run_records_result_and_releases_lock(mock_fetch, fake_redis):
+    mock_fetch.return_value = FetchResult(fetched=2, skipped=0, failed=0)
+    run_id, _ = await claim_run("markets", fake_redis, "cron")
+
+    result = await execute_run(run_id, "markets", fake_redis, _no_session)
+
+    assert result.fetched == 2
+    state = await get_run_state(run_id, fake_redis)
+    assert state["status"] == "done"
+    assert FetchResult.model_validate_json(state["result"]).fetched == 2
+    assert await fake_redis.get(RUN_LOCK_KEY) is None
+    assert await fake_redis.get(LAST_STARTED_KEY) is not None
+
+
+@patch("app.services.scheduler.fetch_and_store_articles", new_callable=AsyncMock)
+async def test_execute_run_records_failure(mock_fetch, fake_redis):
+    mock_fetch.side_effect = Exception("Marketaux down")
+    run_id, _ = await claim_run("markets", fake_redis, "cron")
+
+    with pytest.raises(Exception, match="Marketaux down"):
+        await execute_run(run_id, "markets", fake_redis, _no_session)
+
+    state = await get_run_state(run_id, fake_redis)
+    assert state["status"] == "failed"
+    assert state["error"] == "Marketaux down"
+    assert await fake_redis.get(RUN_LOCK_KEY) is None
+
+
+async def test_execute_run_cancelled_when_lease_lost(fake_redis, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "fetch_lock_ttl", 1)
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def slow_fetch(keyword, db, progress):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    run_id, _ = await claim_run("markets", fake_redis, "api")
+    with patch("app.services.scheduler.fetch_and_store_articles", slow_fetch):
+        run = asyncio.create_task(execute_run(run_id, "markets", fake_redis, _no_session))
+        await started.wait()
+        # Another run took over after the lock expired
+        await fake_redis.set(RUN_LOCK_KEY, "other-run")
+        with pytest.raises(LeaseLostError):
+            await asyncio.wait_for(run, 2)
+
+    assert cancelled.is_set()
+    assert (await get_run_state(run_id, fake_redis))["status"] == "failed"
+    assert await fake_redis.get(RUN_LOCK_KEY) == "other-run"
+
+
+async def test_stop_background_runs_fails_and_unlocks_them(fake_redis):
+    from app.services import scheduler
+
+    started = asyncio.Event()
+
+    async def slow_fetch(keyword, db, progress):
+        started.set()
+        await asyncio.sleep(10)
+
+    with patch("app.services.scheduler.fetch_and_store_articles", slow_fetch):
+        run_id, _ = await start_run("markets", fake_redis, _no_session, "api")
+        await started.wait()
+        await stop_background_runs()
+
+    assert not scheduler._background
+    assert (await get_run_state(run_id, fake_redis))["status"] == "failed"
+    assert await fake_redis.get(RUN_LOCK_KEY) is None
+
+
+@patch("app.services.scheduler.start_run", new_callable=AsyncMock, return_value=("run-1", True))
+async def test_only_leader_schedules(mock_start, fake_redis):
+    a = FetchScheduler(_no_session, instance_id="a")
+    b = FetchScheduler(_no_session, instance_id="b")
+
+    assert await a.tick(fake_redis) == "run-1"
+    assert await b.tick(fake_redis) is None
+    assert await fake_redis.get(LEADER_KEY) == "a"
+    mock_start.assert_awaited_once()
+
+
+@patch("app.services.scheduler.start_run", new_callable=AsyncMock, return_value=("run-1", True))
+async def test_leader_waits_for_interval(mock_start, fake_redis):
+    await fake_redis.set(LAST_STARTED_KEY, time.time())
+    scheduler = FetchScheduler(_no_session, instance_id="a")
+
+    assert await scheduler.tick(fake_redis) is None
+    mock_start.assert_not_awaited()
@@ -0,0 +1,66 @@
+from datetime import date
+from unittest.mock import patch
+
+import httpx
+import pytest
+import respx
+from sqlalchemy import select
+
+from app.models import ArticleStat
+from app.services.fetcher import MARKETAUX_URL, fetch_and_store_articles
+from app.services.stats import get_stats, rebuild_stats
+from tests.test_fetcher import MARKETAUX_RESPONSE
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _rollup(db_session):
+    rows = (await db_session.execute(select(ArticleStat))).scalars().all()
+    return sorted((r.day, r.source, r.search_keyword, r.article_count, r.with_content) for r in rows)
+
+
+@respx.mock
+@patch("app.services.fetcher.scrape_article_content", side_effect=["Content.", None])
+async def test_fetch_updates_rollup(mock_scrape, db_session):
+    respx.get(MARKETAUX_URL).mock(return_value=httpx.Response(200, json=MARKETAUX_RESPONSE))
+
+    await fetch_and_store_articles("markets", db_session)
+
+    assert await _rollup(db_session) == [
+        (date(2026, 2, 20), "example.com", "markets", 1, 1),
+        (date(2026, 2, 21), "other.com", "markets", 1, 0),
+    ]
+
+
+@respx.mock
+@patch("app.services.fetcher.scrape_article_content", return_value="Content.")
+async def test_rollup_accumulates_across_fetches(mock_scrape, db_session):
+    respx.get(MARKETAUX_URL).mock(return_value=httpx.Response(200, json=MARKETAUX_RESPONSE))
+    await fetch_and_store_articles("markets", db_session)
+
+    second = {"data": [{**MARKETAUX_RESPONSE["data"][0], "uuid": "uuid-003"}]}
+    respx.get(MARKETAUX_URL).mock(return_value=httpx.Response(200, json=second))
+    await fetch_and_store_articles("markets", db_session)
+
+    stats = await get_stats(db_session)
+    assert stats.total == 3
+    assert stats.by_source[0].key == "example.com"
+    assert stats.by_source[0].count == 2
+
+
+async def test_rebuild_matches_articles(db_session, sample_article, sample_article_no_content):
+    rows = await rebuild_stats(db_session)
+    assert rows == 2
+
+    stats = await get_stats(db_session)
+    assert stats.total == 2
+    assert stats.with_content == 1
+    assert stats.content_coverage == 0.5
+    assert [d.day for d in stats.by_day] == [date(2026, 2, 19), date(2026, 2, 20)]
+
+
+async def test_get_stats_since(db_session, sample_article, sample_article_no_content):
+    await rebuild_stats(db_session)
+    stats = await get_stats(db_session, since=date(2026, 2, 20))
+    assert stats.total == 1
+    assert stats.by_keyword[0].key == "markets"
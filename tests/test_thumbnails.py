@@ -0,0 +1,163 @@
+import asyncio
+import io
+import os
+import uuid
+
+import httpx
+import pytest
+import respx
+from PIL import Image
+
+from app.services.thumbnails import (
+    WIDTHS,
+    ThumbnailCache,
+    ThumbnailError,
+    Thumbnailer,
+    download,
+    pick_width,
+    render,
+)
+
+IMAGE_URL = "https://example.com/image.jpg"
+IDS = [uuid.UUID(int=i) for i in range(1, 4)]
+
+
+def test_pick_width_rounds_up_to_a_variant():
+    assert pick_width(1) == WIDTHS[0]
+    assert pick_width(WIDTHS[0] + 1) == WIDTHS[1]
+    assert pick_width(5000) == WIDTHS[-1]
+
+
+def test_render_makes_every_variant(sample_jpeg):
+    variants = render(sample_jpeg)
+
+    assert set(variants) == {(w, f) for w in WIDTHS for f in ("webp", "jpeg")}
+    with Image.open(io.BytesIO(variants[(320, "webp")])) as img:
+        assert img.format == "WEBP"
+        assert img.size == (320, 213)
+    assert len(variants[(640, "jpeg")]) < len(sample_jpeg)
+
+
+def test_render_rejects_non_images():
+    with pytest.raises(ThumbnailError):
+        render(b"<html>not an image</html>")
+
+
+def test_cache_evicts_least_recently_used(thumbnail_dir):
+    cache = ThumbnailCache(max_bytes=2500)
+    variants = {(320, "jpeg"): b"x" * 1000}
+    for i, article_id in enumerate(IDS[:2]):
+        cache.put(article_id, variants)
+        os.utime(os.path.join(thumbnail_dir, str(article_id)), (1000 + i, 1000 + i))
+    # A hit makes the oldest entry the most recently used
+    assert cache.get(IDS[0], 320, "jpeg") == variants[(320, "jpeg")]
+
+    cache.put(IDS[2], variants)
+
+    assert cache.has(IDS[0])
+    assert not cache.has(IDS[1])
+    assert cache.has(IDS[2])
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_concurrent_requests_download_once(sample_jpeg):
+    route = respx.get(IMAGE_URL).mock(return_value=httpx.Response(200, content=sample_jpeg))
+    thumbnailer = Thumbnailer()
+
+    results = await asyncio.gather(*(thumbnailer.generate(IDS[0], IMAGE_URL) for _ in range(3)))
+
+    assert route.call_count == 1
+    assert results[0] is results[1] is results[2]
+    assert await thumbnailer.cached(IDS[0], 640, "webp") == results[0][(640, "webp")]
+    thumbnailer.shutdown()
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_failed_source_is_not_refetched():
+    route = respx.get(IMAGE_URL).mock(return_value=httpx.Response(404))
+    thumbnailer = Thumbnailer()
+
+    for _ in range(2):
+        with pytest.raises(ThumbnailError):
+            await thumbnailer.generate(IDS[0], IMAGE_URL)
+
+    assert route.call_count == 1
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_oversized_source_is_refused(monkeypatch, sample_jpeg):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "thumbnail_max_source_bytes", 100)
+    respx.get(IMAGE_URL).mock(return_value=httpx.Response(200, content=sample_jpeg))
+
+    with pytest.raises(ThumbnailError):
+        await Thumbnailer().generate(IDS[0], IMAGE_URL)
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_pregenerate_skips_cached_and_survives_failures(sample_jpeg):
+    respx.get(IMAGE_URL).mock(return_value=httpx.Response(200, content=sample_jpeg))
+    respx.get("https://example.com/broken.jpg").mock(return_value=httpx.Response(500))
+    thumbnailer = Thumbnailer()
+
+    made = await thumbnailer.pregenerate([(IDS[0], IMAGE_URL), (IDS[1], "https://example.com/broken.jpg")])
+    assert made == 1
+    assert await thumbnailer.pregenerate([(IDS[0], IMAGE_URL)]) == 0
+    thumbnailer.shutdown()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "url",
+    [
+        "file:///etc/passwd",
+        "http://127.0.0.1:6379/",
+        "http://169.254.169.254/latest/meta-data/",
+        "http://[::1]/image.jpg",
+    ],
+)
+async def test_download_refuses_non_public_targets(url):
+    with pytest.raises(ThumbnailError):
+        await download(url)
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_download_checks_every_redirect(monkeypatch):
+    async def resolve_host(host, port):
+        return ["10.0.0.5"] if host == "internal.example" else ["93.184.216.34"]
+
+    monkeypatch.setattr("app.services.thumbnails.resolve_host", resolve_host)
+    respx.get(IMAGE_URL).mock(
+        return_value=httpx.Response(302, headers={"Location": "http://internal.example/secret"})
+    )
+    internal = respx.get("http://internal.example/secret")
+
+    with pytest.raises(ThumbnailError, match="not a public address"):
+        await download(IMAGE_URL)
+    assert not internal.called
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_download_checks_the_connected_address(monkeypatch):
+    # The name resolved to a public address for the check, then to a private one on connect
+    monkeypatch.setattr("app.services.thumbnails.peer_address", lambda response: "10.0.0.5")
+    respx.get(IMAGE_URL).mock(return_value=httpx.Response(200, content=b"secret"))
+
+    with pytest.raises(ThumbnailError, match="non-public address 10.0.0.5"):
+        await download(IMAGE_URL)
+
+
+@pytest.mark.asyncio
+@respx.mock
+async def test_download_caps_redirects():
+    respx.get(IMAGE_URL).mock(return_value=httpx.Response(302, headers={"Location": IMAGE_URL}))
+
+    with pytest.raises(ThumbnailError, match="Too many redirects"):
+        await download(IMAGE_URL)
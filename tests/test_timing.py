@@ -0,0 +1,102 @@
+import os
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.timing import ServerTimingMiddleware, format_server_timing
+from app.timing import RequestTimings, current_timings, span
+from tests.conftest import SAMPLE_ARTICLE_ID
+
+pytestmark = pytest.mark.asyncio
+
+
+def _spans(header: str) -> dict[str, float]:
+    return {
+        name: float(dur.removeprefix("dur="))
+        for name, dur in (entry.strip().split(";") for entry in header.split(","))
+    }
+
+
+async def test_span_is_noop_outside_request():
+    assert current_timings.get() is None
+    with span("db"):
+        pass
+
+
+async def test_format_server_timing_orders_spans():
+    timings = RequestTimings()
+    timings.add("llm", 0.5)
+    timings.add("db", 0.002)
+    timings.add("db", 0.001)
+    assert format_server_timing(timings, 0.6) == "db;dur=3.0, llm;dur=500.0, total;dur=600.0"
+
+
+def _timed_client(**kwargs) -> AsyncClient:
+    from app.main import app
+
+    wrapped = ServerTimingMiddleware(app, **kwargs)
+    return AsyncClient(transport=ASGITransport(app=wrapped), base_url="http://test")
+
+
+async def test_server_timing_on_list(client, sample_article):
+    async with _timed_client(public=True) as timed:
+        resp = await timed.get("/articles")
+    spans = _spans(resp.headers["server-timing"])
+    assert {"db", "serialize", "total"} <= spans.keys()
+    assert spans["total"] >= spans["db"]
+
+
+async def test_server_timing_on_fresh_summary(client, sample_article):
+    async with _timed_client(public=True) as timed:
+        resp = await timed.get(f"/articles/{SAMPLE_ARTICLE_ID}/summary")
+    spans = _spans(resp.headers["server-timing"])
+    assert {"db", "redis", "llm", "serialize", "total"} <= spans.keys()
+
+
+async def test_server_timing_only_for_admin_by_default(client, sample_article):
+    async with _timed_client(admin_token="secret") as timed:
+        anonymous = await timed.get("/articles")
+        wrong = await timed.get("/articles", headers={"X-Admin-Token": "wrong"})
+        admin = await timed.get("/articles", headers={"X-Admin-Token": "secret"})
+
+    assert "server-timing" not in anonymous.headers
+    assert "server-timing" not in wrong.headers
+    assert "db" in _spans(admin.headers["server-timing"])
+
+
+# ---------------------------------------------------------------------------
+# ProfilingMiddleware
+# ---------------------------------------------------------------------------
+
+async def _profiled_client(tmp_path, **kwargs):
+    from app.main import app
+
+    wrapped = ProfilingMiddleware(app, output_dir=str(tmp_path), interval_ms=1, **kwargs)
+    return AsyncClient(transport=ASGITransport(app=wrapped), base_url="http://test")
+
+
+async def test_profile_requested_by_admin(client, sample_article, tmp_path):
+    async with await _profiled_client(tmp_path, admin_token="secret") as profiled:
+        resp = await profiled.get("/articles", headers={"X-Profile": "1", "X-Admin-Token": "secret"})
+
+    path = resp.headers["x-profile-path"]
+    assert os.path.dirname(path) == str(tmp_path)
+    assert os.path.exists(path)
+
+
+async def test_profile_ignored_without_valid_token(client, tmp_path):
+    async with await _profiled_client(tmp_path, admin_token="secret") as profiled:
+        resp = await profiled.get("/health", headers={"X-Profile": "1", "X-Admin-Token": "wrong"})
+
+    assert "x-profile-path" not in resp.headers
+    assert os.listdir(tmp_path) == []
+
+
+async def test_profile_sampled_fraction(client, tmp_path):
+    async with await _profiled_client(tmp_path, sample_rate=1.0) as profiled:
+        resp = await profiled.get("/health")
+
+    # Sampled profiles are written but not advertised to the caller
+    assert "x-profile-path" not in resp.headers
+    assert len(os.listdir(tmp_path)) == 1